@@ -1,29 +1,101 @@
 import pandas as pd
 import os
+import json
 import logging
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 
-# Setup logging
-log_file_path = "1_data_cleaning_log.txt"
+from instrumentation import instrument
+from pipeline_store import append_stage, stage_path, write_stage
+
+# Setup logging (CLEANING_LOG moves the log, e.g. for benchmark runs)
+log_file_path = os.environ.get("CLEANING_LOG", "1_data_cleaning_log.txt")
 logging.basicConfig(
     filename=log_file_path,
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+numeric_columns = ['reactions', 'comments', 'shares']
+text_columns = ['TL', 'Post content']
+content_columns = ['TL', 'Post content', 'Nur Repost']
 
-def clean_dataset(file_path, output_file_path):
-    sheet_name = "Technology & Innovation"
-    df = pd.read_excel(file_path, sheet_name=sheet_name)
+# "full" re-cleans the whole workbook; "incremental" cleans a new batch against the Post URL index;
+# "all_sheets" cleans every industry sheet of the workbook in parallel
+CLEANING_MODE = os.environ.get("CLEANING_MODE", "full")
+INDEX_BATCH = 500
+
+# Audit trail next to the output stage: one summary line per run in <stage>.audit.jsonl
+# plus one Parquet file of affected rows per run in <stage>.audit/
+# The full duplicate / missing value sheets are only added to the xlsx export on request
+EXPORT_AUDIT_SHEETS = os.environ.get("EXPORT_AUDIT_SHEETS", "0") == "1"
+
+
+# =============================================================================
+# Engagement Count Parsing
+# =============================================================================
+COUNT_PATTERN = r"^\s*(\d[\d.,'\s\xa0]*?)\s*([kKmMbB])?\s*$"
+GROUPED_INTEGER_PATTERN = r"^(?:\d+|\d{1,3}(?:[.,'\s\xa0]\d{3})+)$"
+SUFFIX_MANTISSA_PATTERN = r"^\d+(?:[.,]\d+)?$"
+COUNT_SUFFIXES = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
+
+def parse_engagement_counts(values):
+    """
+    Vectorized parser for scraped engagement counts; returns (Int32 counts, unparsed mask).
+
+    Handles thousands separators ("1,234", "1.234", "1 234"), K/M/B suffixes with either
+    decimal mark ("1.2K", "3,5M") and numeric cells. Excel reads a dotted thousands
+    separator as a decimal and drops its trailing zeros ("6.389" -> 6.389, "2.380" -> 2.38),
+    so numeric cells with up to three decimal digits are scaled back by 1000. Numeric cells
+    with more decimals, text fractions ("1.5") and negative counts are left unparsed.
+    Missing values become 0; values that cannot be parsed stay <NA>.
+    """
+    if values.dtype == object:
+        is_text = values.map(lambda value: isinstance(value, str), na_action="ignore").fillna(False).astype(bool)
+    elif pd.api.types.is_numeric_dtype(values):
+        is_text = pd.Series(False, index=values.index)
+    else:
+        is_text = values.notna()
 
-    numeric_columns = ['reactions', 'comments', 'shares']
-    text_columns = ['TL', 'Post content']
+    numbers = pd.to_numeric(values.where(~is_text), errors='coerce').astype('float64')
+    has_fraction = numbers % 1 != 0
+    scaled = numbers * 1000
+    dotted_thousands = (scaled - scaled.round()).abs() < 1e-6  # At most three decimal digits
+    counts = numbers.where(~has_fraction, scaled.round().where(dotted_thousands))
+    counts = counts.where(counts >= 0)
 
+    # Text cells go through the suffix / separator rules
+    if is_text.any():
+        parts = values[is_text].astype("string").str.extract(COUNT_PATTERN)
+        number, suffix = parts[0], parts[1].str.lower()
+        grouped = suffix.isna() & number.str.fullmatch(GROUPED_INTEGER_PATTERN).fillna(False)
+        suffixed = suffix.notna() & number.str.fullmatch(SUFFIX_MANTISSA_PATTERN).fillna(False)
+        text_counts = pd.Series(float("nan"), index=parts.index)
+        text_counts[grouped] = pd.to_numeric(number[grouped].str.replace(r"\D", "", regex=True))
+        text_counts[suffixed] = (pd.to_numeric(number[suffixed].str.replace(",", ".", regex=False))
+                                 * suffix[suffixed].map(COUNT_SUFFIXES)).round()
+        counts[is_text] = text_counts
+
+    unparsed = values.notna() & counts.isna()
+    counts = counts.where(values.notna(), 0)
+    return counts.astype('Int32'), unparsed
+
+
+def clean_frame(df):
+    """
+    Cleans a raw sheet; returns the cleaned frame, the duplicate rows, the rows with
+    missing numbers and the rows with engagement values that could not be parsed.
+    """
     missing_values = df[df[numeric_columns].isna().any(axis=1)]
-    df[numeric_columns] = df[numeric_columns].fillna(0)
 
+    unparsed_mask = pd.Series(False, index=df.index)
     for col in numeric_columns:
-        df[col] = df[col].astype(str).str.replace(r'[,\.]', '', regex=True)
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+        df[col], col_unparsed = parse_engagement_counts(df[col])
+        unparsed_mask |= col_unparsed
+    unparsed = df[unparsed_mask]
 
     df[text_columns] = df[text_columns].astype(str).apply(lambda col: col.str.strip().fillna(''))
 
@@ -31,33 +103,290 @@ def clean_dataset(file_path, output_file_path):
     df.drop_duplicates(subset=['Post URL'], inplace=True)
 
     df['Nur Repost'] = df['Nur Repost'].apply(lambda x: 1 if str(x).strip().lower() == 'x' else 0).astype('int8')
-    df = df.astype({col: 'int32' for col in numeric_columns})
-
-    changes_summary = {
-        "Duplicates Removed": len(duplicates),
-        "Missing Numeric Values Set to 0": len(missing_values)
-    }
-
-    with open(log_file_path, "a") as log_file:
-        log_file.write("\nCleaning Summary:\n")
-        log_file.write(f"Duplicates Removed: {len(duplicates)}\n")
-        log_file.write(f"Duplicate Entries:\n{duplicates.to_string(index=False)}\n")
-        log_file.write(f"Missing Numeric Values Set to 0: {len(missing_values)}\n")
-        for col in numeric_columns:
-            missing_count = missing_values[col].isna().sum()
-            if missing_count > 0:
-                log_file.write(f"Column '{col}' had {missing_count} missing values replaced with 0.\n")
-        log_file.write("-------------------------------------\n")
-
-    logging.info(f"Cleaned dataset and logs saved to {output_file_path} and {log_file_path}")
-
-    with pd.ExcelWriter(output_file_path, engine='xlsxwriter') as writer:
-        df.to_excel(writer, sheet_name="Cleaned Data", index=False)
-        duplicates.to_excel(writer, sheet_name="Removed Duplicates", index=False)
-        missing_values.to_excel(writer, sheet_name="Missing Numeric Values", index=False)
-
-
-base_path = os.path.dirname(os.path.abspath(__file__))
-input_file_path = os.path.join(base_path, "0_data_set.xlsx")
-output_file_path = os.path.join(base_path, "1_data_set_cleaned.xlsx")
-clean_dataset(input_file_path, output_file_path)
+    return df, duplicates, missing_values, unparsed
+
+
+# =============================================================================
+# Persistent Post URL Index
+# =============================================================================
+class PostIndex:
+    """SQLite index of every cleaned Post URL with its content hash and last known engagement."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS posts ("
+            "url TEXT PRIMARY KEY, content_hash INTEGER, reactions INTEGER, comments INTEGER, shares INTEGER, "
+            "last_seen INTEGER)"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS audit (url TEXT, run_id TEXT, action TEXT)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS audit_url ON audit (url)")
+
+    def lookup(self, urls):
+        """Returns the indexed rows for `urls` only, so the cost follows the batch size."""
+        rows = []
+        for i in range(0, len(urls), INDEX_BATCH):
+            batch = urls[i:i + INDEX_BATCH]
+            rows += self.conn.execute(
+                f"SELECT url, content_hash, reactions, comments, shares FROM posts "
+                f"WHERE url IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+        return pd.DataFrame(rows, columns=['Post URL', 'content_hash'] + numeric_columns)
+
+    def upsert(self, df):
+        now = int(time.time())
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?, ?)",
+            ((url, int(h), *(None if pd.isna(v) else int(v) for v in counts), now) for url, h, *counts in
+             df[['Post URL', 'content_hash'] + numeric_columns].itertuples(index=False))
+        )
+        self.conn.commit()
+
+    def reset(self):
+        self.conn.execute("DELETE FROM posts")
+        self.conn.commit()
+
+    def add_audit(self, rows):
+        self.conn.executemany("INSERT INTO audit VALUES (?, ?, ?)",
+                              rows[['Post URL', 'run_id', 'action']].itertuples(index=False))
+        self.conn.commit()
+
+    def runs_for(self, url):
+        """Returns (run_id, action) for every cleaning run that touched the post."""
+        return self.conn.execute("SELECT run_id, action FROM audit WHERE url = ? ORDER BY run_id", (url,)).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+def format_count(value):
+    """Engagement count for audit details; a count that was never parsed shows as NA."""
+    return "NA" if pd.isna(value) else str(int(value))
+
+
+def content_hash(df):
+    """Vectorized 64-bit hash of the post content columns, stored as signed int for SQLite."""
+    return pd.util.hash_pandas_object(df[content_columns], index=False).to_numpy().view('int64')
+
+
+# =============================================================================
+# Cleaning Audit
+# =============================================================================
+class CleaningAudit:
+    """
+    Collects the counts and affected rows of one cleaning run.
+
+    `close` appends the run summary to the JSONL file, writes the affected Post URLs
+    with their row hashes to a Parquet file and records them in the Post URL index.
+    Both files default to sidecars of the output stage.
+    """
+
+    def __init__(self, mode, output_stage, runs_path=None, rows_dir=None):
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.mode = mode
+        self.runs_path = runs_path or stage_path(output_stage, "audit.jsonl")
+        self.rows_dir = rows_dir or stage_path(output_stage, "audit")
+        self.counts = {}
+        self.rows = []
+
+    def count(self, name, value, sheet_name=None):
+        key = f"{sheet_name}: {name}" if sheet_name else name
+        self.counts[key] = self.counts.get(key, 0) + int(value)
+
+    def record(self, action, rows, sheet_name=None, detail=None):
+        self.count(action, len(rows), sheet_name)
+        if rows.empty:
+            return
+        self.rows.append(pd.DataFrame({
+            'run_id': self.run_id,
+            'sheet': sheet_name or '',
+            'action': action,
+            'Post URL': rows['Post URL'].astype(str).to_numpy(),
+            'row_hash': pd.util.hash_pandas_object(rows, index=False).to_numpy().view('int64'),
+            'detail': detail if detail is not None else ''
+        }))
+
+    def record_cleaning(self, duplicates, missing_values, unparsed, sheet_name=None):
+        dropped = duplicates.duplicated(subset=['Post URL'], keep='first')
+        self.record('duplicate_dropped', duplicates[dropped], sheet_name)
+        self.record('duplicate_kept', duplicates[~dropped], sheet_name)
+        missing_detail = missing_values[numeric_columns].isna().apply(
+            lambda row: ", ".join(row.index[row]), axis=1).to_numpy()
+        self.record('missing_numeric_set_to_0', missing_values, sheet_name, detail=missing_detail)
+        unparsed_detail = unparsed[numeric_columns].isna().apply(
+            lambda row: ", ".join(row.index[row]), axis=1).to_numpy()
+        self.record('unparsed_count_left_empty', unparsed, sheet_name, detail=unparsed_detail)
+
+    def close(self, index_path=None):
+        with open(self.runs_path, "a") as runs_file:
+            runs_file.write(json.dumps({
+                "run_id": self.run_id,
+                "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "mode": self.mode,
+                "counts": self.counts
+            }) + "\n")
+        if self.rows:
+            rows = pd.concat(self.rows, ignore_index=True)
+            os.makedirs(self.rows_dir, exist_ok=True)
+            rows.to_parquet(os.path.join(self.rows_dir, f"run-{self.run_id}.parquet"), index=False)
+            if index_path:
+                index = PostIndex(index_path)
+                try:
+                    index.add_audit(rows)
+                finally:
+                    index.close()
+        logging.info(f"Cleaning run {self.run_id} ({self.mode}): {self.counts}")
+
+
+def runs_for_post(post_url, index_path):
+    """Answers which cleaning runs dropped or changed a given post."""
+    index = PostIndex(index_path)
+    try:
+        return index.runs_for(post_url)
+    finally:
+        index.close()
+
+
+def rebuild_index(index_path, df):
+    """Replaces the Post URL index with the rows of a full cleaning output."""
+    index = PostIndex(index_path)
+    try:
+        index.reset()
+        index.upsert(df.assign(content_hash=content_hash(df)))
+    finally:
+        index.close()
+
+
+def clean_dataset(file_path, output_stage, index_path=None):
+    with instrument("cleaning.full") as perf:
+        sheet_name = "Technology & Innovation"
+        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        perf['rows_in'] = len(df)
+
+        df, duplicates, missing_values, unparsed = clean_frame(df)
+        audit = CleaningAudit("full", output_stage)
+        audit.record_cleaning(duplicates, missing_values, unparsed)
+        audit.count('rows_out', len(df))
+        perf['rows_out'] = len(df)
+
+        extra_sheets = {
+            "Removed Duplicates": duplicates,
+            "Missing Numeric Values": missing_values
+        } if EXPORT_AUDIT_SHEETS else None
+        output_file_path = write_stage(df, output_stage, sheet_name="Cleaned Data", extra_sheets=extra_sheets)
+
+        # A full run rebuilds the Post URL index used by the incremental mode
+        if index_path:
+            rebuild_index(index_path, df)
+        audit.close(index_path)
+        logging.info(f"Cleaned dataset saved to {output_file_path}, audit run {audit.run_id} in {audit.runs_path}")
+
+
+def _clean_sheet(file_path, sheet_name):
+    """Pool worker: reads and cleans one sheet, tagging its rows with the industry."""
+    df = pd.read_excel(file_path, sheet_name=sheet_name)
+    df, duplicates, missing_values, unparsed = clean_frame(df)
+    df['industry'] = sheet_name
+    return sheet_name, df, duplicates, missing_values, unparsed
+
+
+def clean_all_sheets(file_path, output_stage, index_path=None, workers=None):
+    """
+    Cleans every sheet of the workbook, one sheet per worker process.
+
+    Sheets are industry verticals; all rows go into one output partitioned by 'industry'.
+    """
+    with instrument("cleaning.all_sheets") as perf:
+        sheet_names = pd.ExcelFile(file_path).sheet_names
+        with ProcessPoolExecutor(max_workers=workers or min(len(sheet_names), os.cpu_count())) as pool:
+            results = list(pool.map(_clean_sheet, [file_path] * len(sheet_names), sheet_names))
+
+        audit = CleaningAudit("all_sheets", output_stage)
+        for sheet_name, sheet_df, duplicates, missing_values, unparsed in results:
+            audit.record_cleaning(duplicates, missing_values, unparsed, sheet_name=sheet_name)
+            audit.count('rows_out', len(sheet_df), sheet_name)
+
+        df = pd.concat([result[1] for result in results], ignore_index=True)
+        perf['rows_in'] = sum(len(result[1]) + len(result[2]) for result in results)
+
+        # A post listed in several sheets is kept once, under the first sheet listing it
+        across_sheets = df.duplicated(subset=['Post URL'], keep='first')
+        audit.record('duplicate_dropped_across_sheets', df[across_sheets])
+        df = df[~across_sheets].reset_index(drop=True)
+        audit.count('rows_out', len(df))
+        perf['rows_out'] = len(df)
+        output_file_path = write_stage(df, output_stage, sheet_name="Cleaned Data", partition_cols=['industry'])
+
+        # Every sheet was cleaned, so the Post URL index is rebuilt as in a full run
+        if index_path:
+            rebuild_index(index_path, df)
+        audit.close(index_path)
+        logging.info(f"Cleaned {len(sheet_names)} sheets ({len(df)} rows) and saved them to {output_file_path}")
+
+
+def clean_incremental(batch_file_path, output_stage, index_path):
+    """
+    Cleans only a new batch and appends new or changed posts to the stage output.
+
+    Known posts with the same content but new engagement numbers are appended as
+    updates and reported; unchanged posts are skipped.
+    """
+    with instrument("cleaning.incremental") as perf:
+        sheet_name = "Technology & Innovation"
+        df = pd.read_excel(batch_file_path, sheet_name=sheet_name)
+        perf['rows_in'] = len(df)
+
+        df, duplicates, missing_values, unparsed = clean_frame(df)
+        df['industry'] = sheet_name  # Same partition column as the all_sheets output
+        df['content_hash'] = content_hash(df)
+
+        index = PostIndex(index_path)
+        try:
+            known = index.lookup(df['Post URL'].tolist())
+            merged = df.merge(known, on='Post URL', how='left', suffixes=('', '_known'), indicator=True)
+            is_new = (merged['_merge'] == 'left_only').to_numpy()
+            is_changed = ~is_new & (merged['content_hash'] != merged['content_hash_known']).to_numpy()
+            engagement_changed = ~is_new & ~is_changed & (
+                merged[numeric_columns].astype('float64').fillna(-1).to_numpy()
+                != merged[[f"{col}_known" for col in numeric_columns]].astype('float64').fillna(-1).to_numpy()
+            ).any(axis=1)
+
+            changed_rows = df[is_new | is_changed | engagement_changed]
+            perf['rows_out'] = len(changed_rows)
+
+            engagement_updates = merged.loc[engagement_changed, ['Post URL'] + numeric_columns +
+                                            [f"{col}_known" for col in numeric_columns]]
+            audit = CleaningAudit("incremental", output_stage)
+            audit.record_cleaning(duplicates, missing_values, unparsed)
+            audit.count('batch_rows', len(df))
+            audit.record('new_post_appended', df[is_new].drop(columns='content_hash'))
+            audit.record('changed_post_appended', df[is_changed].drop(columns='content_hash'))
+            audit.record('engagement_updated', df[engagement_changed].drop(columns='content_hash'), detail=[
+                ", ".join(f"{col} {format_count(row[i + 4])} -> {format_count(row[i + 1])}"
+                          for i, col in enumerate(numeric_columns))
+                for row in engagement_updates.itertuples(index=False)
+            ])
+
+            # The index records the rows last, after the part and the audit are written: if the
+            # run fails before, the rows are still unknown and the next run appends them again
+            if not changed_rows.empty:
+                append_stage(changed_rows.drop(columns='content_hash'), output_stage)
+            audit.close(index_path)
+            if not changed_rows.empty:
+                index.upsert(changed_rows)
+        finally:
+            index.close()
+        logging.info(f"Appended {len(changed_rows)} of {len(df)} batch rows to {output_stage}")
+        return engagement_updates
+
+
+if __name__ == "__main__":
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    input_file_path = os.path.join(base_path, os.environ.get("CLEANING_INPUT", "0_data_set.xlsx"))
+    index_file_path = os.path.join(base_path, "1_post_url_index.sqlite")
+    if CLEANING_MODE == "incremental":
+        clean_incremental(input_file_path, "1_data_set_cleaned", index_file_path)
+    elif CLEANING_MODE == "all_sheets":
+        clean_all_sheets(input_file_path, "1_data_set_cleaned", index_file_path)
+    else:
+        clean_dataset(input_file_path, "1_data_set_cleaned", index_file_path)
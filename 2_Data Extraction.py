@@ -1,13 +1,18 @@
+import json
 import os
 import re
-import urllib.parse
 from datetime import datetime, timezone
 
+import numpy as np
 import pandas as pd
 import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from nltk.tokenize import word_tokenize
-from nltk import pos_tag
+
+from cta_matcher import get_cta_matcher
+from engagement_cube import INPUT_COLUMNS as CUBE_INPUT_COLUMNS, cube_stage, sync_cube
+from instrumentation import instrument, timed
+from pipeline_store import read_stage, stage_columns
+from post_schema import read_posts, write_posts
+from sentiment_cache import SENTIMENT_COLUMNS, SentimentCache, analyze_sentiment_series
 
 # =============================================================================
 # Download necessary NLTK resources (only downloads if not already present)
@@ -17,9 +22,6 @@ nltk.download("stopwords", quiet=True)
 nltk.download("punkt", quiet=True)
 nltk.download("averaged_perceptron_tagger", quiet=True)
 
-# Initialize Sentiment Analyzer
-analyzer = SentimentIntensityAnalyzer()
-
 # =============================================================================
 # Precompiled Regex Patterns
 # =============================================================================
@@ -40,6 +42,17 @@ EMOJI_PATTERN = re.compile(
 HASHTAG_PATTERN = re.compile(r"#\w+")
 QUOTE_PATTERN = re.compile(r'["]([^\"]+)["]')
 URL_PATTERN = re.compile(r'https?://\S+|www\.\S+', flags=re.IGNORECASE)
+ACTIVITY_ID_PATTERN = r"activity-(\d+)"
+
+# CTA phrase dictionaries (one phrase per line), separated by os.pathsep, e.g.
+# CTA_PHRASE_FILES=cta_en.txt:cta_de.txt; empty uses the built-in English list
+CTA_PHRASE_FILES = tuple(path for path in os.environ.get("CTA_PHRASE_FILES", "").split(os.pathsep) if path)
+
+# Optional posting-time zones, a JSON file such as
+# {"default": "UTC", "sheets": {"Technology & Innovation": "Europe/Berlin"}, "authors": {"Allie Miller": "America/New_York"}}
+# Author entries win over sheet (industry) entries; without a file all posting times are UTC.
+TIMEZONE_FILE = os.environ.get("TIMEZONE_FILE", "")
+POSTING_TIME_COLUMNS = ["Post Local Time", "Post Timezone", "Day of Week", "Hour of Day"]
 
 
 # =============================================================================
@@ -74,16 +87,9 @@ def extract_emojis(text: str) -> str:
     return ", ".join(EMOJI_PATTERN.findall(text))
 
 
+@timed()
 def extract_cta(text: str) -> list:
-    cta_phrases = [
-        "act now", "apply today", "be sure to", "book now", "buy now", "call today",
-        "check out", "click here", "discover", "download now", "find out more",
-        "follow this", "get a quote", "join today", "learn more", "order now",
-        "register", "save big", "save money", "see more", "shop now", "sign up",
-        "start now", "try it today", "visit our", "watch for"
-    ]
-    text_lower = text.lower()
-    found_ctas = [phrase for phrase in cta_phrases if phrase in text_lower]
+    found_ctas = get_cta_matcher(CTA_PHRASE_FILES).find(text)
     return [1 if found_ctas else 0, ", ".join(found_ctas)]
 
 
@@ -116,43 +122,134 @@ class LIPostTimestampExtractor:
         except (ValueError, IndexError):
             return 'Date not available', None
 
+    @staticmethod
+    def decode_activity_urls(post_urls: pd.Series) -> pd.DataFrame:
+        """
+        Vectorized decoder for a Series of post URLs.
+
+        The first 41 bits of the 64-bit activity ID hold the post time in epoch milliseconds.
+        Returns 'Post Timestamp (ISO)' as datetime64[ms, UTC] and 'Post Timestamp (Unix)' as
+        nullable Int64 seconds; URLs without a valid activity ID become NaT / <NA>.
+        """
+        ids = post_urls.astype("string").str.extract(ACTIVITY_ID_PATTERN, expand=False)
+        # More than 19 digits cannot be a LinkedIn uint64 ID
+        valid = (ids.str.len() <= 19).fillna(False).to_numpy(dtype=bool, copy=True)
+
+        linkedin_ids = np.zeros(len(ids), dtype=np.uint64)
+        linkedin_ids[valid] = ids[valid].astype("uint64").to_numpy()
+        timestamp_ms = (linkedin_ids >> np.uint64(22)).astype(np.int64)
+        valid &= timestamp_ms > 0
+
+        iso = timestamp_ms.view("datetime64[ms]").copy()
+        iso[~valid] = np.datetime64("NaT")
+        unix = pd.array(timestamp_ms // 1000, dtype="Int64")
+        unix[~valid] = pd.NA
+        return pd.DataFrame({
+            "Post Timestamp (ISO)": pd.Series(iso, index=post_urls.index).dt.tz_localize("UTC"),
+            "Post Timestamp (Unix)": pd.Series(unix, index=post_urls.index)
+        })
+
+
+def load_timezone_map(path: str) -> dict:
+    """Reads the TIMEZONE_FILE mapping; an empty path means every post is in UTC."""
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def posting_time_columns(df: pd.DataFrame, timestamps: pd.Series, timezone_map: dict) -> pd.DataFrame:
+    """
+    Returns the local posting time, its zone, and day of week (0 = Monday) / hour as Int8.
+
+    Each row's zone comes from its author, then its sheet ('industry'), then the default.
+    Timestamps are converted once per distinct zone, so the cost does not grow per author.
+    """
+    zones = pd.Series(timezone_map.get("default", "UTC"), index=df.index, dtype="str")
+    if timezone_map.get("sheets") and "industry" in df.columns:
+        zones = df["industry"].map(timezone_map["sheets"]).fillna(zones).astype("str")
+    if timezone_map.get("authors"):
+        zones = df["TL"].map(timezone_map["authors"]).fillna(zones).astype("str")
+
+    local = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ms]")
+    for zone in zones.unique():
+        in_zone = (zones == zone).to_numpy()
+        local[in_zone] = timestamps[in_zone].dt.tz_convert(zone).dt.tz_localize(None).astype("datetime64[ms]")
+
+    return pd.DataFrame({
+        "Post Local Time": local,
+        "Post Timezone": zones.astype("category"),
+        "Day of Week": local.dt.dayofweek.astype("Int8"),
+        "Hour of Day": local.dt.hour.astype("Int8")
+    })
+
 
 # =============================================================================
-# Sentiment Analysis Function
+# Fused Feature Extraction
 # =============================================================================
-def analyze_sentiment(text: str) -> tuple:
-    """Returns sentiment scores (positive, neutral, negative, and compound) for a given text."""
-    scores = analyzer.polarity_scores(text)
-    return scores["pos"], scores["neu"], scores["neg"], scores["compound"]
+CONTENT_COLUMNS = [
+    "CTA Present", "CTA Found", "Contains Hashtag", "Contains Emoji", "Extracted Emojis",
+    "Contains Question", "Contains Link", "Extracted Link", "Contains Quote"
+]
+
+
+def extract_features(text: str) -> tuple:
+    """
+    Computes every post content feature in one visit of the text, in CONTENT_COLUMNS order.
+
+    Each pattern runs once; presence flags are derived from the extracted values.
+    """
+    cta_present, cta_found = extract_cta(text)
+    emojis = EMOJI_PATTERN.findall(text)
+    link_match = URL_PATTERN.search(text)
+    link = link_match.group(0) if link_match else ""
+    return (
+        cta_present,
+        cta_found,
+        1 if HASHTAG_PATTERN.search(text) else 0,
+        1 if emojis else 0,
+        ", ".join(emojis),
+        1 if "?" in text else 0,
+        1 if link else 0,
+        link,
+        1 if QUOTE_PATTERN.search(text) else 0
+    )
 
 
 # =============================================================================
 # Data Processing Function
 # =============================================================================
-def process_linkedin_data(file_path: str, output_file: str):
-    df = pd.read_excel(file_path)
-    df["Post content"] = df["Post content"].fillna("")
-
-    df["CTA Present"], df["CTA Found"] = zip(*df["Post content"].apply(extract_cta))
-    df["Contains Hashtag"] = df["Post content"].apply(contains_hashtag)
-    df["Contains Emoji"] = df["Post content"].apply(contains_emoji)
-    df["Extracted Emojis"] = df["Post content"].apply(extract_emojis)
-    df["Contains Question"] = df["Post content"].apply(contains_question)
-    df["Contains Link"] = df["Post content"].apply(contains_link)
-    df["Extracted Link"] = df["Post content"].apply(extract_link)
-    df["Contains Quote"] = df["Post content"].apply(contains_quote)
-    df["Post ID"] = df["Post URL"].apply(extract_post_id)
-
-    df[["Post Timestamp (ISO)", "Post Timestamp (Unix)"]] = df["Post URL"].apply(
-        lambda x: pd.Series(LIPostTimestampExtractor.get_date_from_linkedin_activity(x))
-    )
-
-    # Apply sentiment analysis
-    df["Positive Sentiment"], df["Neutral Sentiment"], df["Negative Sentiment"], df["Compound Sentiment"] = zip(
-        *df["Post content"].apply(analyze_sentiment)
-    )
-
-    df.to_excel(output_file, index=False)
+def process_linkedin_data(input_stage: str, output_stage: str):
+    with instrument("extraction") as perf:
+        df = read_stage(input_stage)
+        perf["rows_in"] = len(df)
+        df["Post content"] = df["Post content"].fillna("")
+
+        # Single scan over the post content fills all feature columns
+        with instrument("extract_features", rows_in=len(df)):
+            df[CONTENT_COLUMNS] = pd.DataFrame([extract_features(text) for text in df["Post content"]],
+                                               columns=CONTENT_COLUMNS, index=df.index)
+        df["Post ID"] = df["Post URL"].apply(extract_post_id)
+
+        df[["Post Timestamp (ISO)", "Post Timestamp (Unix)"]] = LIPostTimestampExtractor.decode_activity_urls(df["Post URL"])
+        df[POSTING_TIME_COLUMNS] = posting_time_columns(df, df["Post Timestamp (ISO)"], load_timezone_map(TIMEZONE_FILE))
+
+        # Sentiment scores come from the persistent cache; misses are scored in a process pool
+        cache = SentimentCache()
+        try:
+            with instrument("analyze_sentiment", rows_in=len(df)):
+                df[SENTIMENT_COLUMNS] = analyze_sentiment_series(df["Post content"], cache=cache)
+        finally:
+            cache.close()
+
+        # The engagement cube (stored next to the output) only absorbs the posts that changed
+        # since the last run; an earlier output without all cube columns (older schema) triggers a rebuild
+        has_previous = set(CUBE_INPUT_COLUMNS) <= set(stage_columns(output_stage))
+        previous = read_posts(output_stage, columns=CUBE_INPUT_COLUMNS) if has_previous else None
+        df, output_file = write_posts(df, output_stage)
+        with instrument("engagement_cube", rows_in=len(df)):
+            sync_cube(df, previous, cube_stage(output_stage))
+        perf["rows_out"] = len(df)
     print(f"Processed data saved to {output_file}")
 
 
@@ -160,4 +257,4 @@ def process_linkedin_data(file_path: str, output_file: str):
 # Run the Processing Function
 # =============================================================================
 if __name__ == "__main__":
-    process_linkedin_data("1_data_set_cleaned.xlsx", "2_processed_linkedin_data.xlsx")
+    process_linkedin_data("1_data_set_cleaned", "2_processed_linkedin_data")
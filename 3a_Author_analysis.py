@@ -1,11 +1,15 @@
 import pandas as pd
 
-# Load dataset
-file_path = "2_processed_linkedin_data.xlsx"  # Update with the correct local path
-df = pd.read_excel(file_path, sheet_name='Sheet1')
+from engagement_cube import query, read_cube
 
-# Compute mean engagement per author
-author_engagement = df.groupby("TL")[["reactions", "comments", "shares"]].mean()
+# Load the engagement cube (aggregated by the extraction stage)
+metrics = ["reactions", "comments", "shares"]
+cube = read_cube()
+
+# Compute mean engagement per author from the cube cells
+author_engagement = query(cube, by=["TL"], metrics=metrics, quantiles=())
+author_engagement = author_engagement[[f"{metric} mean" for metric in metrics]]
+author_engagement.columns = metrics
 
 # Save results to an Excel file
 output_xlsm = "3a_author_mean_engagement.xlsx"  # Keep consistent variable naming
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from feature_comparison import compare_features
+from post_schema import FEATURE_FLAGS, METRICS, read_posts
+from rank_engine import RankEngine
+
+# Define file path
+stage = "2_processed_linkedin_data"
+
+# Load only the feature flags (boolean views of the packed bitmask) and metrics
+df = read_posts(stage, columns=list(FEATURE_FLAGS) + METRICS)
+
+# Compare every feature flag against every metric; the ranks are shared with the Dunn's Test below
+ranks = RankEngine(df, METRICS)
+results = compare_features(df, ranks=ranks)
+print(results.to_string(index=False))
+
+# Dunn's Test of original posts against reposts (read by the 3e_a heatmaps)
+df["Post Type"] = np.where(df["Nur Repost"].fillna(0) == 1, "Repost", "Original")
+dunn_results_list = []
+for metric in METRICS:
+    dunn_results = ranks.dunn(metric, "Post Type", p_adjust="bonferroni")
+    dunn_results.reset_index(inplace=True)
+    dunn_results.insert(0, "Metric", metric)
+    dunn_results_list.append(dunn_results)
+dunn_final_results = pd.concat(dunn_results_list, ignore_index=True)
+
+# Save the consolidated result table
+output_file = "3b_feature_comparison.xlsx"
+with pd.ExcelWriter(output_file, engine="xlsxwriter") as writer:
+    results.to_excel(writer, sheet_name="Feature Comparison", index=False)
+    results.pivot(index="Feature", columns="Metric", values="Percentage Change").to_excel(writer, sheet_name="Percentage Change")
+    results.pivot(index="Feature", columns="Metric", values="P-Value").to_excel(writer, sheet_name="P-Values")
+    dunn_final_results.to_excel(writer, sheet_name="Dunn's Test", index=False)
+
+# Plot the average engagement with and without each feature, one panel per metric
+fig, axes = plt.subplots(1, len(METRICS), figsize=(6 * len(METRICS), 6), sharey=False)
+for ax, metric in zip(axes, METRICS):
+    metric_results = results[results["Metric"] == metric].set_index("Feature")
+    metric_results[["Mean Without", "Mean With"]].plot(kind="bar", ax=ax)
+    ax.set_title(metric.capitalize())
+    ax.set_ylabel("Average Count")
+    ax.tick_params(axis="x", rotation=45)
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+plt.suptitle("Average Engagement With and Without Each Post Feature")
+
+plot_file = "3b_feature_comparison_plot.png"
+plt.savefig(plot_file, bbox_inches="tight")
+plt.close(fig)
+
+print(f"Analysis completed! \nResults saved to: {output_file} \nPlot saved to: {plot_file}")
@@ -1,30 +1,30 @@
 import pandas as pd
 import scipy.stats as stats
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scikit_posthocs import posthoc_dunn
 
-# Load the LinkedIn data
-file_path = "2_processed_linkedin_data.xlsx"
-df = pd.read_excel(file_path)
+from engagement_cube import DAY_NAMES
+from pipeline_store import read_stage
+from rank_engine import RankEngine
 
-# Remove invalid timestamp entries
-df_cleaned = df[df['Post Timestamp (ISO)'] != "Invalid LinkedIn ID"].copy()
-df_cleaned['Post Timestamp (ISO)'] = pd.to_datetime(df_cleaned['Post Timestamp (ISO)'], errors='coerce')
-df_cleaned = df_cleaned.dropna(subset=['Post Timestamp (ISO)'])
-df_cleaned['Day of Week'] = df_cleaned['Post Timestamp (ISO)'].dt.day_name()
+# Load the LinkedIn data (day of week is precomputed in the poster's local time, 0 = Monday)
+stage = "2_processed_linkedin_data"
+df = read_stage(stage, columns=["Day of Week", "reactions", "comments", "shares"])
+
+# Remove posts without a valid timestamp
+df_cleaned = df.dropna(subset=['Day of Week']).copy()
+df_cleaned['Day of Week'] = df_cleaned['Day of Week'].astype(int).map(dict(enumerate(DAY_NAMES)))
 
 # Define engagement metrics
 metrics = ['reactions', 'comments', 'shares']
 
 # Normalize engagement by the number of posts per day
-posts_per_day = df_cleaned.groupby("Day of Week")["Post Timestamp (ISO)"].count()
+posts_per_day = df_cleaned.groupby("Day of Week")["Day of Week"].count()
 df_cleaned[metrics] = df_cleaned[metrics].div(df_cleaned["Day of Week"].map(posts_per_day), axis=0)
 
 # Store results
 normality_results = []
 kruskal_results = []
 dunn_results_list = []
+ranks = RankEngine(df_cleaned, metrics)
 
 for col in metrics:
     # Prepare data for statistical tests
@@ -39,13 +39,13 @@ for col in metrics:
 
     if not is_normal:
         # Run Kruskal-Wallis test if data is not normal
-        h_stat, kw_p_value = stats.kruskal(*groups)
+        h_stat, kw_p_value = ranks.kruskal(col, "Day of Week")
         kruskal_results.append([col, h_stat, kw_p_value, "Significant" if kw_p_value < 0.05 else "Not Significant"])
         print(f"Kruskal-Wallis Test for {col}: H-statistic = {h_stat:.3f}, p-value = {kw_p_value:.5f}")
 
         # If Kruskal-Wallis is significant, run Dunn's Test for pairwise comparisons
         if kw_p_value < 0.05:
-            dunn_results = posthoc_dunn(df_cleaned, val_col=col, group_col="Day of Week", p_adjust="bonferroni")
+            dunn_results = ranks.dunn(col, "Day of Week", p_adjust="bonferroni")
             dunn_results.reset_index(inplace=True)
             dunn_results.insert(0, "Metric", col)  # Add metric column for clarity
             dunn_results_list.append(dunn_results)
@@ -1,24 +1,20 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
 import scipy.stats as stats
-from scikit_posthocs import posthoc_dunn
-import seaborn as sns
 
-# Load the LinkedIn data
-file_path = "2_processed_linkedin_data.xlsx"
-df = pd.read_excel(file_path)
+from pipeline_store import excel_safe
+from post_schema import METRICS, read_posts
+from rank_engine import RankEngine
 
-# Remove invalid timestamp entries
-df_cleaned = df[df['Post Timestamp (ISO)'] != "Invalid LinkedIn ID"].copy()
+# Load the LinkedIn data (only the columns of the hourly export and the tests)
+stage = "2_processed_linkedin_data"
+df = read_posts(stage, columns=["Post URL", "TL", "Post Timestamp (ISO)", "Post Local Time", "Hour of Day"] + METRICS)
 
-# Convert timestamp to datetime and extract the hour of the day
-df_cleaned['Post Timestamp (ISO)'] = pd.to_datetime(df_cleaned['Post Timestamp (ISO)'], errors='coerce')
-df_cleaned = df_cleaned.dropna(subset=['Post Timestamp (ISO)'])  # Drop rows where conversion failed
-df_cleaned['Hour of Day'] = df_cleaned['Post Timestamp (ISO)'].dt.hour
+# Remove posts without a valid timestamp (the hour is precomputed in the poster's local time)
+df_cleaned = df.dropna(subset=['Hour of Day']).copy()
+df_cleaned['Hour of Day'] = df_cleaned['Hour of Day'].astype(int)
 
 # Count posts per hour
-posts_per_hour = df_cleaned.groupby("Hour of Day")["Post Timestamp (ISO)"].count()
+posts_per_hour = df_cleaned.groupby("Hour of Day")["Hour of Day"].count()
 
 # Normalize engagement metrics by the number of posts per hour
 metrics = ['reactions', 'comments', 'shares']
@@ -26,7 +22,7 @@ df_cleaned[metrics] = df_cleaned[metrics].div(df_cleaned["Hour of Day"].map(post
 
 # Save normalized interactions to an Excel file
 output_file = "3d_normalized_interactions_by_hour.xlsx"
-df_cleaned.to_excel(output_file, index=False)
+excel_safe(df_cleaned).to_excel(output_file, index=False)
 print(f"Normalized data saved to {output_file}")
 
 # Perform Normality Test (Shapiro-Wilk)
@@ -34,6 +30,7 @@ print("Normality Test (Shapiro-Wilk):")
 normality_results = []
 kruskal_results = []
 dunn_results_list = []
+ranks = RankEngine(df_cleaned, metrics)
 
 for col in metrics:
     # Prepare data for statistical tests
@@ -48,13 +45,13 @@ for col in metrics:
 
     if not is_normal:
         # Run Kruskal-Wallis test if data is not normal
-        h_stat, kw_p_value = stats.kruskal(*groups)
+        h_stat, kw_p_value = ranks.kruskal(col, "Hour of Day")
         kruskal_results.append([col, h_stat, kw_p_value, "Significant" if kw_p_value < 0.05 else "Not Significant"])
         print(f"Kruskal-Wallis Test for {col}: H-statistic = {h_stat:.3f}, p-value = {kw_p_value:.5f}")
 
         # If Kruskal-Wallis is significant, run Dunn's Test for pairwise comparisons
         if kw_p_value < 0.05:
-            dunn_results = posthoc_dunn(df_cleaned, val_col=col, group_col="Hour of Day", p_adjust="bonferroni")
+            dunn_results = ranks.dunn(col, "Hour of Day", p_adjust="bonferroni")
             dunn_results.reset_index(inplace=True)
             dunn_results.insert(0, "Metric", col)  # Add metric column for clarity
             dunn_results_list.append(dunn_results)
@@ -1,12 +1,15 @@
 import pandas as pd
-import scipy.stats as stats
-from scikit_posthocs import posthoc_dunn
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from box_summary import box_stats, summary_boxplot
+from pipeline_store import read_stage
+from rank_engine import RankEngine
+
 # Load the processed LinkedIn data
-file_path = "2_processed_linkedin_data.xlsx"
-df = pd.read_excel(file_path)
+stage = "2_processed_linkedin_data"
+df = read_stage(stage, columns=["Positive Sentiment", "Neutral Sentiment", "Negative Sentiment", "Compound Sentiment",
+                               "reactions", "comments", "shares"])
 
 # Define sentiment and engagement columns
 sentiment_columns = ["Positive Sentiment", "Neutral Sentiment", "Negative Sentiment", "Compound Sentiment"]
@@ -23,9 +26,9 @@ df_cleaned["Sentiment Category"] = pd.cut(df_cleaned["Compound Sentiment"], bins
 # Compute mean and median engagement per sentiment category
 engagement_summary = df_cleaned.groupby("Sentiment Category")[engagement_columns].agg(['mean', 'median'])
 
-# Perform Kruskal-Wallis test for each engagement metric
-df_grouped = df_cleaned.groupby("Sentiment Category")[engagement_columns]
-kruskal_results = {metric: stats.kruskal(*[group[metric].values for _, group in df_grouped]) for metric in engagement_columns}
+# Perform Kruskal-Wallis test for each engagement metric (each metric is ranked once for all tests)
+ranks = RankEngine(df_cleaned, engagement_columns)
+kruskal_results = {metric: ranks.kruskal(metric, "Sentiment Category") for metric in engagement_columns}
 
 # Convert Kruskal-Wallis results to DataFrame with correct column names
 kruskal_df = pd.DataFrame(kruskal_results, index=["H Statistic", "p-value"]).T
@@ -33,7 +36,7 @@ kruskal_df = pd.DataFrame(kruskal_results, index=["H Statistic", "p-value"]).T
 # Perform Dunn’s test for post-hoc analysis and combine all results into one DataFrame
 dunn_results_combined = []
 for metric in engagement_columns:
-    dunn_df = posthoc_dunn(df_cleaned, val_col=metric, group_col="Sentiment Category", p_adjust='bonferroni')
+    dunn_df = ranks.dunn(metric, "Sentiment Category", p_adjust='bonferroni')
     dunn_df.insert(0, "Metric", metric)
     dunn_results_combined.append(dunn_df)
 
@@ -45,14 +48,17 @@ with pd.ExcelWriter("3k_Sentiment_Analysis.xlsx") as writer:
     kruskal_df.to_excel(writer, sheet_name="Kruskal-Wallis Test")
     dunn_results_df.to_excel(writer, sheet_name="Dunn's Test", index=False)
 
-# Visualization: Boxplot to show engagement distribution per sentiment
-plt.figure(figsize=(12, 6))
+# Visualization: Boxplot to show engagement distribution per sentiment, drawn from
+# per-category box statistics so the cost does not grow with the number of posts
+colors = sns.color_palette("coolwarm", len(labels))
 for metric in engagement_columns:
-    plt.figure(figsize=(8, 6))
-    sns.boxplot(x="Sentiment Category", y=metric, data=df_cleaned, palette="coolwarm")
-    plt.title(f"Engagement ({metric}) by Sentiment Category")
-    plt.xticks(rotation=45)
-    plt.savefig(f"{metric}_sentiment_boxplot.png")
-    plt.close()
+    fig, ax = plt.subplots(figsize=(8, 6))
+    summary_boxplot(ax, box_stats(df_cleaned, "Sentiment Category", metric), labels=labels, colors=colors)
+    ax.set_title(f"Engagement ({metric}) by Sentiment Category")
+    ax.set_xlabel("Sentiment Category")
+    ax.set_ylabel(metric)
+    plt.setp(ax.get_xticklabels(), rotation=45)
+    fig.savefig(f"{metric}_sentiment_boxplot.png", bbox_inches="tight")
+    plt.close(fig)
 
 print("Sentiment impact analysis on engagement completed. Results saved to 3k_Sentiment_Analysis.xlsx")
@@ -1,12 +1,17 @@
+import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.cluster import KMeans
 
+# The stage store lives in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from post_schema import expand_posts, read_posts
+
 # Load the processed LinkedIn dataset
-file_path = "../2_processed_linkedin_data.xlsx"
-df = pd.read_excel(file_path, sheet_name="Sheet1")
+df = expand_posts(read_posts("2_processed_linkedin_data"))
 
 # Extracting the post content for clustering
 text_data = df["Post content"].dropna().tolist()
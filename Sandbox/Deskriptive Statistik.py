@@ -1,10 +1,16 @@
+import os
+import sys
+
 import pandas as pd
 
+# The stage store lives in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from post_schema import expand_posts, read_posts
 
-# Load the Excel file
-def analyze_linkedin_data(file_path, output_file):
-    # Read the Excel file
-    df = pd.read_excel(file_path)
+# Load the processed posts stage
+def analyze_linkedin_data(stage, output_file):
+    # Read the stage in the flat layout (0/1 flag columns)
+    df = expand_posts(read_posts(stage))
 
     # Select only numeric columns
     numeric_columns = ["reactions", "comments", "shares", "Sentiment_Positive", "Sentiment_Neutral",
@@ -53,7 +59,7 @@ def analyze_linkedin_data(file_path, output_file):
     print(f"Processed data saved to {output_file}")
 
 
-# Provide the file path
-file_path = "../2_processed_linkedin_data.xlsx"
+# Provide the stage name
+stage = "2_processed_linkedin_data"
 output_file = "deskriptive_statistik.xlsx"
-analyze_linkedin_data(file_path, output_file)
\ No newline at end of file
+analyze_linkedin_data(stage, output_file)
\ No newline at end of file
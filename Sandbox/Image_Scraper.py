@@ -1,19 +1,34 @@
 import pandas as pd
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
-import requests
 import os
+import sys
 import time
 from selenium import webdriver
+from selenium.common.exceptions import JavascriptException
+
+# The browser pool lives in the project root, shared with the metrocuadrado scraper
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from browser_profile import IMAGES_READY, apply_block_profile, configure_options, wait_until_ready
+from dom_extract import extract_images
+from driver_pool import DriverPool
+from image_store import ImageStore
+
+# Post images must still load (their rendered size picks the main one); fonts, media and trackers are blocked
+BLOCK_PROFILE = os.environ.get("IMAGE_BLOCK_PROFILE", "images")
+IMAGE_HOST = "media.licdn.com"
+
 # Set up Selenium WebDriver
 def setup_driver():
     options = Options()
     options.add_argument("--headless")  # Run in headless mode
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
-    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    configure_options(options)  # Eager page load; readiness is checked per post below
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    apply_block_profile(driver, BLOCK_PROFILE)
+    return driver
 
 
 # Scroll to bottom for lazy-loaded content
@@ -22,28 +37,19 @@ def scroll_to_bottom(driver):
     time.sleep(0.1)  # Allow time for lazy loading
 
 
-# Extract the main post-specific image
+# Extract the main post-specific image; browser failures (WebDriverException) go to the pool's crash retry
 def extract_post_specific_image(driver, post_url):
-    try:
-        driver.get(post_url)
-        scroll_to_bottom(driver)
+    driver.get(post_url)
+    wait_until_ready(driver, IMAGES_READY, IMAGE_HOST, timeout=10)
+    scroll_to_bottom(driver)
 
-        # Locate all images broadly
-        image_elements = driver.find_elements(By.XPATH, "//img[contains(@src, 'media.licdn.com')]")
-        print(f"Found {len(image_elements)} images on the page.")
+    try:
+        # Locate all images broadly, with their src and size read in one script call
+        images = extract_images(driver, IMAGE_HOST)
+        print(f"Found {len(images)} images on the page.")
 
         # Filter images containing 'feedshare' in their URLs
-        feedshare_images = []
-        for img in image_elements:
-            try:
-                src = img.get_attribute("src")
-                width = img.get_attribute("width")
-                height = img.get_attribute("height")
-
-                if src and "feedshare" in src:
-                    feedshare_images.append({"src": src, "width": int(width or 0), "height": int(height or 0)})
-            except Exception as e:
-                print(f"Error processing an image: {e}")
+        feedshare_images = [image for image in images if "feedshare" in image["src"]]
 
         if not feedshare_images:
             print(f"No 'feedshare' images found for post: {post_url}")
@@ -53,34 +59,11 @@ def extract_post_specific_image(driver, post_url):
         largest_image = max(feedshare_images, key=lambda x: x["width"] * x["height"])
         print(f"Selected image: {largest_image['src']} (Area: {largest_image['width'] * largest_image['height']})")
         return largest_image["src"]
-    except Exception as e:
+    except (JavascriptException, KeyError, TypeError) as e:
         print(f"Error extracting image from post {post_url}: {e}")
         return None
 
 
-# Download the image
-def download_image(url, folder="images", filename="latest_image"):
-    try:
-        response = requests.get(url, stream=True, timeout=10)
-        if response.status_code == 200:
-            # Get file extension
-            content_type = response.headers.get("Content-Type")
-            ext = content_type.split("/")[-1] if content_type else "jpg"
-
-            # Save the image
-            if not os.path.exists(folder):
-                os.makedirs(folder)
-            filepath = os.path.join(folder, f"{filename}.{ext}")
-            with open(filepath, "wb") as f:
-                for chunk in response.iter_content(1024):
-                    f.write(chunk)
-            print(f"Downloaded: {filepath}")
-        else:
-            print(f"Failed to download {url} (HTTP {response.status_code})")
-    except Exception as e:
-        print(f"Error downloading image: {e}")
-
-
 # Process multiple LinkedIn URLs
 def process_multiple_links(file_path, sheet_name, url_column, indices):
     # Load the dataset
@@ -93,18 +76,21 @@ def process_multiple_links(file_path, sheet_name, url_column, indices):
     data = all_sheets[sheet_name]
     urls = data.loc[indices, url_column].dropna()
 
-    # Initialize WebDriver
-    driver = setup_driver()
-
-    for idx, post_url in zip(indices, urls):
-        print(f"\nProcessing post {idx}: {post_url}")
-        feedshare_image_url = extract_post_specific_image(driver, post_url)
-        if feedshare_image_url:
-            download_image(feedshare_image_url, filename=f"post_{idx}")
-        else:
-            print(f"No valid images found for post {idx}")
-
-    driver.quit()
+    # Images land in a content-addressed store (IMAGE_DIR); posts it already holds are skipped
+    with ImageStore() as store:
+        pending = urls[~urls.map(store.has).astype(bool)]
+        print(f"{len(urls) - len(pending)} posts already have their image stored")
+
+        # Fan the posts out to a pool of browsers (SELENIUM_WORKERS), rate limited over all of them,
+        # while the images download concurrently over one pooled session (DOWNLOAD_WORKERS)
+        with DriverPool(setup_driver) as pool:
+            for (idx, post_url), feedshare_image_url in pool.map(
+                    lambda driver, row: extract_post_specific_image(driver, row[1]), pending.items()):
+                print(f"\nProcessed post {idx}: {post_url}")
+                if feedshare_image_url:
+                    store.submit(post_url, feedshare_image_url)
+                else:
+                    print(f"No valid images found for post {idx}")
 
 
 # Parameters for the small test sample
@@ -1,26 +1,22 @@
+import os
+import sys
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# Load the dataset
-file_path = "../2_processed_linkedin_data.xlsx"
-df_raw = pd.read_excel(file_path)
-
-# Clean invalid timestamp values
-df_raw = df_raw[df_raw["Post Timestamp (ISO)"].str.contains("Invalid LinkedIn ID") == False].copy()
-
-# Convert timestamp column to datetime
-df_raw["Post Timestamp (ISO)"] = pd.to_datetime(df_raw["Post Timestamp (ISO)"], errors="coerce")
-
-# Drop any rows with missing timestamps after conversion
-df_raw = df_raw.dropna(subset=["Post Timestamp (ISO)"])
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from engagement_cube import DAY_NAMES, query, read_cube
 
-# Extract day of the week and hour
-df_raw["Day of Week"] = df_raw["Post Timestamp (ISO)"].dt.day_name()
-df_raw["Hour of Day"] = df_raw["Post Timestamp (ISO)"].dt.hour
+# Load the engagement cube (posts without a valid timestamp sit in day / hour -1)
+cube = read_cube()
+cube = cube[cube["Day of Week"] >= 0]
 
 # Aggregate engagement metrics by day and hour
-df_grouped = df_raw.groupby(["Day of Week", "Hour of Day"])[["reactions", "comments", "shares"]].mean().reset_index()
+df_grouped = query(cube, by=["Day of Week", "Hour of Day"], quantiles=())
+df_grouped = df_grouped[["reactions mean", "comments mean", "shares mean"]].reset_index()
+df_grouped.columns = ["Day of Week", "Hour of Day", "reactions", "comments", "shares"]
+df_grouped["Day of Week"] = df_grouped["Day of Week"].map(dict(enumerate(DAY_NAMES)))
 
 # Normalize engagement values
 df_grouped[['reactions', 'comments', 'shares']] = df_grouped[['reactions', 'comments', 'shares']].apply(
@@ -0,0 +1,177 @@
+import argparse
+import importlib.util
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pandas as pd
+
+# =============================================================================
+# Benchmark Settings
+# =============================================================================
+# Each corpus size runs in a fresh process, so peak RSS is measured per size.
+# Its stages, engagement cube, cleaning audit and log and sentiment cache live in
+# a temporary directory; only the results in benchmarks/ are kept, and the run
+# fails if any other project file changed.
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(BASE_PATH, "benchmarks")
+SNAPSHOT_SKIP = {"benchmarks", ".git", "__pycache__"}
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+EXCEL_MAX_ROWS = 1_048_575
+REGRESSION_THRESHOLD = 0.8  # Flag stages below 80% of the baseline throughput
+
+
+def _load_script(file_name: str, module_name: str):
+    """Imports one of the numbered pipeline scripts, whose file names are not valid module names."""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(BASE_PATH, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def project_snapshot() -> dict:
+    """Maps every project file outside benchmarks/ to its (mtime, size)."""
+    snapshot = {}
+    for root, dirs, files in os.walk(BASE_PATH):
+        dirs[:] = [d for d in dirs if d not in SNAPSHOT_SKIP]
+        for name in files:
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            snapshot[os.path.relpath(path, BASE_PATH)] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def assert_untouched(before: dict, after: dict):
+    changed = sorted(path for path in after.keys() | before.keys() if before.get(path) != after.get(path))
+    if changed:
+        raise AssertionError(f"Benchmark changed project files: {changed}")
+
+
+def run_size(n_rows: int, seed: int, through_xlsx: bool, work_dir: str):
+    """Generates one corpus in `work_dir` and times cleaning, extraction and the statistical analyses on it."""
+    from feature_comparison import compare_features
+    from instrumentation import instrument
+    from rank_engine import RankEngine
+    from pipeline_store import write_stage
+    from post_schema import FEATURE_FLAGS, METRICS, read_posts
+    from synthetic_corpus import generate_corpus, write_corpus
+
+    cleaning = _load_script("1_Data Cleaning.py", "data_cleaning")
+    extraction = _load_script("2_Data Extraction.py", "data_extraction")
+
+    # Absolute stages: the audit and the engagement cube are stored next to them
+    cleaned_stage = os.path.join(work_dir, "1_data_set_cleaned")
+    processed_stage = os.path.join(work_dir, "2_processed_linkedin_data")
+
+    with instrument(f"generate/{n_rows}", rows_in=n_rows):
+        raw = generate_corpus(n_rows, seed=seed)
+
+    if through_xlsx and n_rows <= EXCEL_MAX_ROWS:
+        workbook = os.path.join(work_dir, "0_data_set.xlsx")
+        with instrument(f"write_xlsx/{n_rows}", rows_in=n_rows):
+            write_corpus(raw, workbook)
+        with instrument(f"clean_dataset/{n_rows}", rows_in=n_rows):
+            cleaning.clean_dataset(workbook, cleaned_stage)
+    else:
+        # Same work as clean_dataset after its read_excel, which cannot hold more than one sheet's rows
+        with instrument(f"clean_dataset/{n_rows}", rows_in=n_rows) as perf:
+            df, _, _, _ = cleaning.clean_frame(raw.copy())
+            write_stage(df, cleaned_stage)
+            perf["rows_out"] = len(df)
+    del raw
+
+    with instrument(f"process_linkedin_data/{n_rows}", rows_in=n_rows):
+        extraction.process_linkedin_data(cleaned_stage, processed_stage)
+
+    df = read_posts(processed_stage, columns=["TL", "Day of Week", "Hour of Day"] + list(FEATURE_FLAGS) + METRICS)
+    with instrument(f"analysis.author_means/{n_rows}", rows_in=len(df)):
+        df.groupby("TL")[["reactions", "comments", "shares"]].mean()
+    with instrument(f"analysis.feature_comparison/{n_rows}", rows_in=len(df)):
+        compare_features(df)
+    with instrument(f"analysis.day_hour_tests/{n_rows}", rows_in=len(df)):
+        ranks = RankEngine(df, ["reactions", "comments", "shares"])
+        for metric in ranks.metrics:
+            for group_col in ("Day of Week", "Hour of Day"):
+                ranks.kruskal(metric, group_col)
+                ranks.dunn(metric, group_col)
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+def summarize(perf_log: str) -> pd.DataFrame:
+    """Turns the benchmark records into one row per step and corpus size."""
+    with open(perf_log, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if '"stage"' in line]
+    df = pd.DataFrame(records)
+    df = df[df["stage"].str.contains(r"/\d+$")].copy()  # Inner records of the pipeline stages are left out
+    df[["step", "rows"]] = df["stage"].str.rsplit("/", n=1, expand=True)
+    df["rows"] = df["rows"].astype("int64")
+    return df[["step", "rows", "wall_s", "cpu_s", "peak_rss_mb", "rows_per_s"]].sort_values(["step", "rows"])
+
+
+def compare_to_baseline(summary: pd.DataFrame, baseline_path: str) -> pd.DataFrame:
+    """Adds the throughput ratio against an earlier summary and flags regressions."""
+    baseline = pd.read_csv(baseline_path)[["step", "rows", "rows_per_s"]]
+    merged = summary.merge(baseline, on=["step", "rows"], how="left", suffixes=("", "_baseline"))
+    merged["throughput_ratio"] = merged["rows_per_s"] / merged["rows_per_s_baseline"]
+    merged["regression"] = merged["throughput_ratio"] < REGRESSION_THRESHOLD
+    return merged
+
+
+def plot_curves(summary: pd.DataFrame, path: str):
+    """Saves throughput and peak memory against corpus size, one line per step (log-log)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, (ax_speed, ax_memory) = plt.subplots(1, 2, figsize=(14, 6))
+    for step, group in summary.groupby("step"):
+        ax_speed.plot(group["rows"], group["rows_per_s"], marker="o", label=step)
+        ax_memory.plot(group["rows"], group["peak_rss_mb"], marker="o", label=step)
+    for ax, label in ((ax_speed, "Rows per second"), (ax_memory, "Peak RSS (MB)")):
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("Corpus rows")
+        ax.set_ylabel(label)
+        ax.grid(True, which="both", linestyle="--", alpha=0.5)
+    ax_speed.legend(fontsize="small")
+    fig.savefig(path, bbox_inches="tight")
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the pipeline on synthetic corpora.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--xlsx", action="store_true", help="Clean from a written workbook (sizes up to Excel's limit)")
+    parser.add_argument("--baseline", help="Earlier summary CSV to compare throughput against")
+    args = parser.parse_args()
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    run_name = time.strftime("%Y%m%d-%H%M%S")
+    perf_log = os.path.join(BENCH_DIR, f"bench_{run_name}.jsonl")
+    before = project_snapshot()
+    for n_rows in sorted(args.sizes):
+        print(f"Benchmarking {n_rows:,} rows")
+        with tempfile.TemporaryDirectory(prefix=f"bench_{n_rows}_") as work_dir:
+            # The child inherits the environment: the benchmark log, and a cold cache and own log per size
+            os.environ["PERF_LOG"] = perf_log
+            os.environ["PROFILE_DIR"] = os.path.join(BENCH_DIR, "profiles")
+            os.environ["SENTIMENT_CACHE_PATH"] = os.path.join(work_dir, "sentiment_cache.sqlite")
+            os.environ["CLEANING_LOG"] = os.path.join(work_dir, "1_data_cleaning_log.txt")
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                pool.submit(run_size, n_rows, args.seed, args.xlsx, work_dir).result()
+        assert_untouched(before, project_snapshot())
+
+    summary = summarize(perf_log)
+    if args.baseline:
+        summary = compare_to_baseline(summary, args.baseline)
+    summary_path = os.path.join(BENCH_DIR, f"summary_{run_name}.csv")
+    summary.to_csv(summary_path, index=False)
+    plot_curves(summary, os.path.join(BENCH_DIR, f"scaling_{run_name}.png"))
+    print(summary.to_string(index=False))
+    print(f"Summary saved to {summary_path}")
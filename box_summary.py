@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# Box Summary Settings
+# =============================================================================
+# Boxplots are drawn from per-group summaries (quartiles, whiskers and a capped
+# sample of outliers), so drawing cost depends on the number of groups, not rows.
+WHISKER_IQR = 1.5  # Whiskers reach the most extreme point within 1.5 IQR of the box, as in matplotlib
+MAX_FLIERS = 200  # Outliers drawn per group; the lowest and highest are always kept
+
+
+def box_stats(df: pd.DataFrame, group_col: str, value_col: str, max_fliers: int = MAX_FLIERS,
+              seed: int = 0) -> list:
+    """
+    Computes matplotlib `bxp` statistics of `value_col` per group with vectorized groupby quantiles.
+
+    Returns one dict per group (in category order for categorical groups); empty groups are left out.
+    """
+    data = df[[group_col, value_col]].dropna()
+    values = data[value_col].astype("float64")
+    grouped = values.groupby(data[group_col], observed=True)
+    quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    q1, q3 = quartiles[0.25], quartiles[0.75]
+    low_limit = q1 - WHISKER_IQR * (q3 - q1)
+    high_limit = q3 + WHISKER_IQR * (q3 - q1)
+
+    # Whiskers end at the most extreme values inside the limits; the rest are outliers
+    row_low = data[group_col].map(low_limit).astype("float64")
+    row_high = data[group_col].map(high_limit).astype("float64")
+    inside = (values >= row_low) & (values <= row_high)
+    whislo = values[inside].groupby(data[group_col][inside], observed=True).min()
+    whishi = values[inside].groupby(data[group_col][inside], observed=True).max()
+
+    # Capped outlier sample: a random subset plus the extremes, which set the axis range
+    outliers = data[~inside]
+    shuffled = outliers.sample(frac=1, random_state=seed)
+    sampled = shuffled.groupby(group_col, observed=True).head(max_fliers)
+    extremes = pd.concat([
+        outliers.loc[outliers.groupby(group_col, observed=True)[value_col].idxmin()],
+        outliers.loc[outliers.groupby(group_col, observed=True)[value_col].idxmax()]
+    ]) if len(outliers) else outliers
+    fliers = pd.concat([sampled, extremes])
+    fliers = fliers[~fliers.index.duplicated()].groupby(group_col, observed=True)[value_col]
+    flier_values = {group: group_values.to_numpy(dtype="float64") for group, group_values in fliers}
+
+    return [{
+        "label": group,
+        "q1": q1[group],
+        "med": quartiles.loc[group, 0.5],
+        "q3": q3[group],
+        "whislo": whislo.get(group, q1[group]),
+        "whishi": whishi.get(group, q3[group]),
+        "fliers": flier_values.get(group, np.empty(0))
+    } for group in quartiles.index]
+
+
+def summary_boxplot(ax, stats: list, labels: list = None, colors: list = None):
+    """Draws `box_stats` output with `Axes.bxp`; `labels` keeps a slot for groups without rows."""
+    labels = labels if labels is not None else [s["label"] for s in stats]
+    positions = [labels.index(s["label"]) for s in stats]
+    boxes = ax.bxp(stats, positions=positions, widths=0.8, patch_artist=True, showfliers=True,
+                   flierprops={"marker": "d", "markersize": 4, "markerfacecolor": "0.3", "markeredgecolor": "0.3"},
+                   medianprops={"color": "0.2"})
+    for patch, position in zip(boxes["boxes"], positions):
+        if colors is not None:
+            patch.set_facecolor(colors[position])
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels)
+    ax.set_xlim(-0.5, len(labels) - 0.5)
+    return boxes
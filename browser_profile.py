@@ -0,0 +1,81 @@
+import os
+import re
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# =============================================================================
+# Browser Profile Settings
+# =============================================================================
+# The scrapers only read embedded JSON or image URLs, so heavy resources and
+# third-party trackers are blocked through the Chrome DevTools Protocol, pages
+# are considered loaded at DOMContentLoaded ("eager"), and each scraper waits for
+# an explicit readiness predicate instead of the full load event.
+PAGE_LOAD_STRATEGY = os.environ.get("PAGE_LOAD_STRATEGY", "eager")
+READY_TIMEOUT = 15
+
+RESOURCE_EXTENSIONS = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "media": ["mp4", "webm", "m3u8", "mp3", "ogg"],
+}
+# Chrome matches a blocked pattern against the whole URL, query string included,
+# so every extension also gets a pattern for URLs like photo.jpg?w=800
+RESOURCE_PATTERNS = {
+    kind: [pattern for ext in extensions for pattern in (f"*.{ext}", f"*.{ext}?*")]
+    for kind, extensions in RESOURCE_EXTENSIONS.items()
+}
+THIRD_PARTY_HOSTS = [
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*adservice.google.com*", "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*clarity.ms*",
+    "*criteo.com*", "*tiktok.com*", "*newrelic.com*", "*nr-data.net*", "*segment.io*",
+]
+# Blocked resource types per profile; every profile except "off" also blocks THIRD_PARTY_HOSTS
+BLOCK_PROFILES = {
+    "off": [],
+    "data": ["image", "font", "media"],  # Pages read only for their DOM / embedded JSON
+    "images": ["font", "media"],  # Image URLs and rendered sizes are needed
+}
+
+# Readiness predicates, evaluated in the page until they return true
+NEXT_DATA_READY = "return document.getElementById('__NEXT_DATA__') !== null"
+LISTINGS_READY = ("return document.querySelector(\"div[data-testid='m2-card-listings-container'], "
+                  "div.m2-card-listing\") !== null")
+IMAGES_READY = ("return Array.from(document.images).some(img => img.src.includes(arguments[0]) "
+                "&& img.complete && img.naturalWidth > 0)")
+
+
+def blocked_urls(profile: str) -> list:
+    """URL patterns blocked by a profile ('off', 'data' or 'images')."""
+    if profile not in BLOCK_PROFILES:
+        raise ValueError(f"Unknown block profile {profile!r}; expected one of {list(BLOCK_PROFILES)}")
+    patterns = [pattern for kind in BLOCK_PROFILES[profile] for pattern in RESOURCE_PATTERNS[kind]]
+    return patterns + THIRD_PARTY_HOSTS if profile != "off" else patterns
+
+
+def url_blocked(url: str, profile: str) -> bool:
+    """Whether Chrome would block `url` under a profile ('*' matches any run of characters over the whole URL)."""
+    return any(re.fullmatch(".*".join(map(re.escape, pattern.split("*"))), url) for pattern in blocked_urls(profile))
+
+
+def configure_options(options, strategy: str = PAGE_LOAD_STRATEGY):
+    """Sets the page-load strategy on Chrome options before the driver is created."""
+    options.page_load_strategy = strategy
+    return options
+
+
+def apply_block_profile(driver, profile: str):
+    """Installs the profile's URL blocklist on a running Chrome driver via CDP."""
+    urls = blocked_urls(profile)
+    if urls:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+
+
+def wait_until_ready(driver, predicate: str, *args, timeout: float = READY_TIMEOUT) -> bool:
+    """Waits until the JavaScript `predicate` returns true; returns False on timeout."""
+    try:
+        WebDriverWait(driver, timeout).until(lambda d: d.execute_script(predicate, *args))
+        return True
+    except TimeoutException:
+        return False
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import time
+
+# =============================================================================
+# Crawl State Settings
+# =============================================================================
+# The scraper's progress lives in SQLite, so an interrupted crawl resumes where it
+# stopped: the frontier of search pages still to visit, and per listing URL its
+# property_id, status and last fetch time. Listings fetched within the freshness
+# window are not fetched again. The frontier belongs to one seed search URL; a
+# crawl started from another URL begins afresh.
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+CRAWL_DB = os.environ.get("CRAWL_DB", os.path.join(BASE_PATH, "metrocuadrado_crawl.sqlite"))
+FRESHNESS_HOURS = float(os.environ.get("FRESHNESS_HOURS", "24"))
+
+
+class CrawlState:
+    """SQLite store of the search page frontier and the visited listing URLs."""
+
+    def __init__(self, path: str = CRAWL_DB, freshness_hours: float = FRESHNESS_HOURS):
+        self.path = path
+        self.freshness_s = freshness_hours * 3600
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_pages ("
+            "url TEXT PRIMARY KEY, page INTEGER, status TEXT, fetched_at REAL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS listings ("
+            "url TEXT PRIMARY KEY, property_id TEXT, status TEXT, page INTEGER, attempts INTEGER DEFAULT 0, "
+            "last_fetched REAL)"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+
+    # -------------------------------------------------------------------------
+    # Search page frontier
+    # -------------------------------------------------------------------------
+    def start_crawl(self, seed_url: str) -> bool:
+        """
+        Seeds the frontier with the first search page unless an interrupted crawl of the
+        same seed URL left pages pending. Returns True when resuming.
+        """
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'seed_url'").fetchone()
+        if row is not None and row[0] == seed_url and self.pending_search_pages():
+            return True
+        if row is not None and row[0] != seed_url:
+            print(f"Search URL changed from {row[0]}; starting a new crawl")
+        self.conn.execute("DELETE FROM search_pages")
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('seed_url', ?)", (seed_url,))
+        self.add_search_page(seed_url, 1)
+        return False
+
+    def add_search_page(self, url: str, page: int):
+        self.conn.execute("INSERT OR IGNORE INTO search_pages VALUES (?, ?, 'pending', NULL)", (url, page))
+        self.conn.commit()
+
+    def pending_search_pages(self) -> list:
+        """Returns (url, page) of the search pages not yet visited, in page order."""
+        return self.conn.execute(
+            "SELECT url, page FROM search_pages WHERE status = 'pending' ORDER BY page"
+        ).fetchall()
+
+    def mark_search_page(self, url: str, status: str = "done"):
+        self.conn.execute("UPDATE search_pages SET status = ?, fetched_at = ? WHERE url = ?",
+                          (status, time.time(), url))
+        self.conn.commit()
+
+    # -------------------------------------------------------------------------
+    # Listings
+    # -------------------------------------------------------------------------
+    def add_listings(self, urls: list, page: int = None):
+        self.conn.executemany("INSERT OR IGNORE INTO listings (url, status, page) VALUES (?, 'pending', ?)",
+                              ((url, page) for url in urls))
+        self.conn.commit()
+
+    def due_listings(self, urls: list = None) -> list:
+        """
+        Returns the listing URLs to fetch: new or failed ones, and those last fetched
+        before the freshness window. With `urls`, only those are considered.
+        """
+        cutoff = time.time() - self.freshness_s
+        rows = self.conn.execute(
+            "SELECT url FROM listings WHERE status != 'done' OR last_fetched IS NULL OR last_fetched < ? "
+            "ORDER BY page, rowid", (cutoff,)
+        ).fetchall()
+        due = [row[0] for row in rows]
+        if urls is not None:
+            wanted = set(urls)
+            due = [url for url in due if url in wanted]
+        return due
+
+    def mark_listing(self, url: str, property_id: str = None, status: str = "done"):
+        """Checkpoints one listing; call it after its row has been written to the output."""
+        self.conn.execute(
+            "UPDATE listings SET status = ?, property_id = COALESCE(?, property_id), attempts = attempts + 1, "
+            "last_fetched = ? WHERE url = ?",
+            (status, str(property_id) if property_id not in (None, "") else None, time.time(), url)
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
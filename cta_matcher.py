@@ -0,0 +1,107 @@
+from collections import deque
+from functools import lru_cache
+
+import pandas as pd
+
+# =============================================================================
+# Default CTA Dictionary
+# =============================================================================
+DEFAULT_CTA_PHRASES = [
+    "act now", "apply today", "be sure to", "book now", "buy now", "call today",
+    "check out", "click here", "discover", "download now", "find out more",
+    "follow this", "get a quote", "join today", "learn more", "order now",
+    "register", "save big", "save money", "see more", "shop now", "sign up",
+    "start now", "try it today", "visit our", "watch for"
+]
+
+
+def load_phrases(path: str) -> list:
+    """Reads a phrase file: one phrase per line, blank lines and '#' comments are ignored."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+# =============================================================================
+# Aho-Corasick Automaton
+# =============================================================================
+class CTAMatcher:
+    """
+    Multi-pattern phrase matcher built once from a phrase dictionary.
+
+    All phrases are found in a single linear scan of the lowercased text, so the
+    cost per post does not grow with the size of the dictionary.
+    """
+
+    def __init__(self, phrases: list, word_boundary: bool = True):
+        self.phrases = list(dict.fromkeys(p.strip().lower() for p in phrases if p.strip()))
+        self.word_boundary = word_boundary
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for idx, phrase in enumerate(self.phrases):
+            self._insert(idx, phrase)
+        self._build_failure_links()
+
+    def _insert(self, idx: int, phrase: str):
+        state = 0
+        for ch in phrase:
+            if ch not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][ch] = len(self._goto) - 1
+            state = self._goto[state][ch]
+        self._out[state].append((idx, len(phrase)))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> list:
+        """Returns the matched phrases in dictionary order, each phrase at most once."""
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        last = len(text) - 1
+        found = set()
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx, length in out[state]:
+                if self.word_boundary:
+                    start = i - length + 1
+                    if start > 0 and text[start - 1].isalnum():
+                        continue
+                    if i < last and text[i + 1].isalnum():
+                        continue
+                found.add(idx)
+        return [self.phrases[idx] for idx in sorted(found)]
+
+    def match_series(self, texts: pd.Series) -> pd.DataFrame:
+        """Batch API: returns 'CTA Present' and 'CTA Found' columns for a Series of post texts."""
+        matches = [self.find(text) for text in texts.fillna("")]
+        return pd.DataFrame({
+            "CTA Present": [1 if found else 0 for found in matches],
+            "CTA Found": [", ".join(found) for found in matches]
+        }, index=texts.index)
+
+
+@lru_cache(maxsize=None)
+def get_cta_matcher(phrase_files: tuple = (), word_boundary: bool = True) -> CTAMatcher:
+    """
+    Returns the cached matcher for the given phrase files.
+
+    Without files the default English dictionary is used; several files (e.g. one per
+    language or industry) are merged into one automaton.
+    """
+    phrases = [phrase for path in phrase_files for phrase in load_phrases(path)] or DEFAULT_CTA_PHRASES
+    return CTAMatcher(phrases, word_boundary=word_boundary)
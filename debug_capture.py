@@ -0,0 +1,118 @@
+import itertools
+import os
+import queue
+import threading
+import time
+
+# =============================================================================
+# Debug Capture Settings
+# =============================================================================
+# Screenshots and page HTML are taken from the browser on the scraping thread but
+# written to disk by one background thread. The hand-off queue is bounded and
+# never blocks the crawl (a full queue drops the capture), and the artifact
+# directory is capped in size by deleting its oldest files.
+DEBUG_LEVELS = ("off", "errors", "full")
+DEBUG_LEVEL = os.environ.get("DEBUG_LEVEL", "errors")  # "full" also captures every navigation step
+DEBUG_DIR = os.environ.get("DEBUG_DIR", "debug_screenshots")
+DEBUG_DIR_MAX_MB = float(os.environ.get("DEBUG_DIR_MAX_MB", "50"))
+DEBUG_QUEUE_SIZE = 32  # Captures waiting to be written
+
+
+class DebugCapture:
+    """
+    Tiered debug artifacts for a Selenium scraper.
+
+    `capture(driver, name)` records a step (kept only at level "full"); `capture(driver, name, error=True)`
+    records a failure (kept at "errors" and "full") with the page HTML. Call `close()` to flush the queue.
+    """
+
+    def __init__(self, level: str = DEBUG_LEVEL, directory: str = DEBUG_DIR, max_mb: float = DEBUG_DIR_MAX_MB,
+                 queue_size: int = DEBUG_QUEUE_SIZE):
+        if level not in DEBUG_LEVELS:
+            raise ValueError(f"Unknown debug level {level!r}; expected one of {DEBUG_LEVELS}")
+        self.level = level
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.dropped = 0
+        self._sequence = itertools.count()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        if level != "off":
+            os.makedirs(directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._write_loop, name="debug-capture", daemon=True)
+            self._thread.start()
+
+    def enabled(self, error: bool = False) -> bool:
+        return self.level == "full" or (error and self.level == "errors")
+
+    # -------------------------------------------------------------------------
+    # Capture (scraping threads)
+    # -------------------------------------------------------------------------
+    def capture(self, driver, name: str, error: bool = False, source: bool = None):
+        """Queues a screenshot of `driver` (plus its HTML when `source`, by default for errors)."""
+        if not self.enabled(error):
+            return
+        source = error if source is None else source
+        stem = f"{name}_{time.strftime('%Y%m%d-%H%M%S')}_{next(self._sequence):05d}"
+        try:
+            artifacts = [(f"{stem}.png", driver.get_screenshot_as_png())]
+            if source:
+                artifacts.append((f"{stem}.html", driver.page_source.encode("utf-8")))
+        except Exception as e:
+            print(f"Debug capture {name} failed: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+            return
+        try:
+            self._queue.put_nowait(artifacts)
+        except queue.Full:
+            self.dropped += 1
+
+    # -------------------------------------------------------------------------
+    # Writing and rotation (background thread)
+    # -------------------------------------------------------------------------
+    def _existing_files(self) -> list:
+        """Returns [mtime, size, path] of the artifact directory's files, oldest first."""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                files.append([stat.st_mtime, stat.st_size, entry.path])
+        return sorted(files)
+
+    def _write_loop(self):
+        files = self._existing_files()
+        total = sum(size for _, size, _ in files)
+        while True:
+            artifacts = self._queue.get()
+            if artifacts is None:
+                break
+            # A failing capture is logged and skipped; the thread keeps serving the queue
+            try:
+                for filename, data in artifacts:
+                    path = os.path.join(self.directory, filename)
+                    try:
+                        with open(path, "wb") as f:
+                            f.write(data)
+                    except OSError as e:
+                        print(f"Could not write debug artifact {path}: {e}")
+                        continue
+                    files.append([time.time(), len(data), path])
+                    total += len(data)
+                # Rotate: the oldest artifacts go first, the newest one is always kept
+                while total > self.max_bytes and len(files) > 1:
+                    _, size, path = files.pop(0)
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    total -= size
+            except Exception as e:
+                print(f"Debug capture writer skipped an item: {type(e).__name__}: {e}")
+
+    def close(self):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if self.dropped:
+            print(f"Dropped {self.dropped} debug captures while the write queue was full")
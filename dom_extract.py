@@ -0,0 +1,52 @@
+# =============================================================================
+# Batched DOM Extraction
+# =============================================================================
+# Each helper runs one execute_script per page: the selector fallbacks and the
+# attribute reads happen inside the browser and come back as one JSON result,
+# instead of a WebDriver round trip per element and attribute.
+
+# Card selectors tried in order; the first one matching any element is used
+CARD_SELECTORS = [
+    ("data-testid", "div[data-testid='m2-card-listings-container']"),
+    ("class-based", "div.m2-card-listing"),
+    ("generic card", "div[class*='card']"),
+]
+LISTING_PATTERNS = ["/inmueble/", "/proyecto/"]
+
+CARD_LINKS_SCRIPT = """
+const [strategies, patterns] = arguments;
+for (const [name, selector] of strategies) {
+    const cards = document.querySelectorAll(selector);
+    if (!cards.length) continue;
+    const links = [];
+    for (const card of cards) {
+        const link = card.querySelector("a");
+        const href = link && link.href;
+        if (href && patterns.some(p => href.includes(p)) && !links.includes(href)) links.push(href);
+    }
+    return {strategy: name, cards: cards.length, links: links};
+}
+return {strategy: null, cards: 0, links: []};
+"""
+
+IMAGES_SCRIPT = """
+const [srcContains] = arguments;
+return Array.from(document.images)
+    .filter(img => img.src && img.src.includes(srcContains))
+    .map(img => ({src: img.src, width: img.width || 0, height: img.height || 0}));
+"""
+
+
+def extract_card_links(driver, strategies: list = None, patterns: list = None) -> dict:
+    """
+    Returns {"strategy", "cards", "links"} for the search result cards of the current page.
+
+    `strategy` names the first selector that matched any card (None if none did) and
+    `links` holds the unique listing URLs of the first link in each card.
+    """
+    return driver.execute_script(CARD_LINKS_SCRIPT, strategies or CARD_SELECTORS, patterns or LISTING_PATTERNS)
+
+
+def extract_images(driver, src_contains: str) -> list:
+    """Returns {"src", "width", "height"} of every image whose URL contains `src_contains`."""
+    return driver.execute_script(IMAGES_SCRIPT, src_contains)
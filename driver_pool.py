@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from selenium.common.exceptions import WebDriverException
+
+# =============================================================================
+# Driver Pool Settings
+# =============================================================================
+# N headless browsers, each owned by one worker thread, share a queue of URLs.
+# A browser is replaced after DRIVER_MAX_PAGES pages, or when a page failed with a
+# WebDriverException and the browser no longer answers the health check; all
+# workers draw page loads from one rate limiter.
+POOL_SIZE = int(os.environ.get("SELENIUM_WORKERS", "2"))
+DRIVER_MAX_PAGES = int(os.environ.get("DRIVER_MAX_PAGES", "50"))
+PAGE_LOAD_RATE = float(os.environ.get("PAGE_LOAD_RATE", "0.5"))  # Page loads per second over all workers
+CRASH_RETRIES = 1  # A page failing with a WebDriverException is retried once (on a fresh browser if it crashed)
+
+
+class RateLimiter:
+    """Thread-safe spacing of events: at most `rate` per second over all callers."""
+
+    def __init__(self, rate: float = PAGE_LOAD_RATE):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class _Slot:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class DriverPool:
+    """
+    Pool of browser drivers made by `factory`, one per worker thread.
+
+    `map(func, items)` calls `func(driver, item)` for every item on the workers and
+    yields (item, result) as pages finish. Use as a context manager so every browser quits.
+    """
+
+    def __init__(self, factory, size: int = POOL_SIZE, max_pages: int = DRIVER_MAX_PAGES,
+                 rate_limiter: RateLimiter = None):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self._local = threading.local()
+        self._slots = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="driver")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------------------------------------------------------------
+    # Driver lifecycle
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def healthy(driver) -> bool:
+        """A driver is healthy when its browser still answers a script call."""
+        try:
+            driver.execute_script("return document.readyState")
+            return True
+        except WebDriverException:
+            return False
+
+    def _quit(self, slot: _Slot):
+        with self._lock:
+            self._slots.discard(slot)
+        try:
+            slot.driver.quit()
+        except Exception:
+            pass
+
+    def _worker_driver(self) -> _Slot:
+        """Returns this thread's driver, replacing it after max_pages pages."""
+        slot = getattr(self._local, "slot", None)
+        if slot is not None and slot.pages >= self.max_pages:
+            print(f"Recycling browser of {threading.current_thread().name} after {slot.pages} pages")
+            self._quit(slot)
+            slot = None
+        if slot is None:
+            slot = _Slot(self.factory())
+            with self._lock:
+                self._slots.add(slot)
+            self._local.slot = slot
+        return slot
+
+    # -------------------------------------------------------------------------
+    # Work distribution
+    # -------------------------------------------------------------------------
+    def _run(self, func, item):
+        for attempt in range(CRASH_RETRIES + 1):
+            slot = self._worker_driver()
+            self.rate_limiter.wait()
+            try:
+                result = func(slot.driver, item)
+                slot.pages += 1
+                return result
+            except WebDriverException:
+                # Only a browser that stopped answering is replaced; the item is retried either way
+                if not self.healthy(slot.driver):
+                    print(f"Browser of {threading.current_thread().name} crashed; replacing it")
+                    self._quit(slot)
+                    self._local.slot = None
+                if attempt == CRASH_RETRIES:
+                    raise
+
+    def map(self, func, items):
+        """Yields (item, result) in completion order; an item whose page failed twice yields result None."""
+        futures = {self._executor.submit(self._run, func, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result()
+            except WebDriverException as e:
+                print(f"  - Browser failed on {item}: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+                yield item, None
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for slot in list(self._slots):
+            self._quit(slot)
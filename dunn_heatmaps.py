@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import matplotlib
+matplotlib.use("Agg")  # Headless: heatmaps are only saved, never shown
+import matplotlib.pyplot as plt
+import pandas as pd
+import seaborn as sns
+
+# =============================================================================
+# Heatmap Settings
+# =============================================================================
+# One spec per analysis whose workbook has a "Dunn's Test" sheet. A heatmap is
+# re-rendered only when the hash of its p-value matrix (and of the spec) differs
+# from the one recorded for its PNG in HEATMAP_STATE.
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+HEATMAP_STATE = os.path.join(BASE_PATH, ".heatmap_state.json")
+DUNN_SHEET = "Dunn's Test"
+METRICS = ["reactions", "comments", "shares"]
+
+
+@dataclass(frozen=True)
+class HeatmapSpec:
+    source: str  # Workbook with the "Dunn's Test" sheet
+    prefix: str  # Output file prefix, one PNG per metric
+    groups: tuple  # Columns of the matrix, in display order
+    title: str  # Formatted with the capitalized metric
+    ylabel: str
+    xlabel: str
+    figsize: tuple = (8, 6)
+    fill_value: float = None  # Replaces missing p-values (e.g. groups without posts)
+
+
+DAY_GROUPS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+HEATMAP_SPECS = {
+    "day": HeatmapSpec("3c_interactions_by_day_tests.xlsx", "3c_a_dunn_heatmap", DAY_GROUPS,
+                       "Dunn's Test - Pairwise Engagement Differences for {metric}",
+                       "Day of the Week", "Compared Day"),
+    "hour": HeatmapSpec("3d_interactions_by_hour_tests.xlsx", "3d_dunn_heatmap", tuple(range(24)),
+                        "Dunn's Test - Pairwise Engagement Differences for {metric} by Hour",
+                        "Hour of the Day", "Compared Hour", figsize=(10, 6), fill_value=1.0),
+    "post_type": HeatmapSpec("3b_feature_comparison.xlsx", "3e_a_dunn_heatmap", ("Original", "Repost"),
+                             "Dunn's Test - Pairwise Engagement Differences for {metric} (Original vs. Repost)",
+                             "Post Type", "Compared Post Type", fill_value=1.0),
+}
+
+
+def output_files(spec: HeatmapSpec) -> list:
+    return [f"{spec.prefix}_{metric}.png" for metric in METRICS]
+
+
+# =============================================================================
+# Rendering
+# =============================================================================
+def render_heatmap(matrix: pd.DataFrame, spec: HeatmapSpec, metric: str, output_file: str) -> str:
+    """Pool worker: draws one p-value matrix and saves it; the figure is closed so memory does not grow."""
+    fig, ax = plt.subplots(figsize=spec.figsize)
+    try:
+        sns.heatmap(matrix, annot=True, cmap="coolwarm", fmt=".2f", linewidths=0.5, ax=ax)
+        ax.set_title(spec.title.format(metric=metric.capitalize()))
+        ax.set_ylabel(spec.ylabel)
+        ax.set_xlabel(spec.xlabel)
+        fig.savefig(os.path.join(BASE_PATH, output_file), bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return output_file
+
+
+def heatmap_jobs(spec: HeatmapSpec) -> list:
+    """Returns (matrix, metric, output file) per metric found in the spec's Dunn's Test sheet."""
+    try:
+        dunn_test_results = pd.read_excel(os.path.join(BASE_PATH, spec.source), sheet_name=DUNN_SHEET)
+    except (FileNotFoundError, ValueError):
+        print(f"Skipping {spec.source}: no '{DUNN_SHEET}' sheet found")
+        return []
+
+    jobs = []
+    for metric, output_file in zip(METRICS, output_files(spec)):
+        subset = dunn_test_results[dunn_test_results["Metric"] == metric]
+        if subset.empty:
+            print(f"Skipping {metric} of {spec.source}: no Dunn's Test results")
+            continue
+        matrix = subset.set_index("index")[list(spec.groups)].astype(float)
+        if spec.fill_value is not None:
+            matrix = matrix.fillna(spec.fill_value)
+        jobs.append((matrix, metric, output_file))
+    return jobs
+
+
+def matrix_hash(matrix: pd.DataFrame, spec: HeatmapSpec, metric: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((spec, metric)).encode())
+    digest.update(matrix.to_csv().encode())
+    return digest.hexdigest()
+
+
+def render_heatmaps(specs: list = None, workers: int = None, force: bool = False) -> dict:
+    """
+    Renders the heatmaps of the given specs (default: all) in a process pool.
+
+    Outputs whose matrix hash is unchanged and whose PNG exists are skipped.
+    Returns {output file: "rendered" | "unchanged"}.
+    """
+    specs = specs or list(HEATMAP_SPECS.values())
+    state = {}
+    if os.path.exists(HEATMAP_STATE):
+        with open(HEATMAP_STATE, encoding="utf-8") as f:
+            state = json.load(f)
+
+    status, to_render = {}, []
+    for spec in specs:
+        for matrix, metric, output_file in heatmap_jobs(spec):
+            key = matrix_hash(matrix, spec, metric)
+            if not force and state.get(output_file) == key and os.path.exists(os.path.join(BASE_PATH, output_file)):
+                status[output_file] = "unchanged"
+            else:
+                to_render.append((matrix, spec, metric, output_file, key))
+
+    if to_render:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(render_heatmap, matrix, spec, metric, output_file)
+                       for matrix, spec, metric, output_file, _ in to_render]
+            for future, (_, _, _, output_file, key) in zip(futures, to_render):
+                future.result()
+                state[output_file] = key
+                status[output_file] = "rendered"
+
+    with open(HEATMAP_STATE + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(HEATMAP_STATE + ".tmp", HEATMAP_STATE)
+    for output_file, result in status.items():
+        print(f"{'Saved' if result == 'rendered' else 'Unchanged'} heatmap: {output_file}")
+    return status
+
+
+if __name__ == "__main__":
+    render_heatmaps()
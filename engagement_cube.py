@@ -0,0 +1,172 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from pipeline_store import read_stage, stage_path, write_stage
+from post_schema import FLAGS_COLUMN, METRICS, POSTS_STAGE, flag_bits, pack_flags, read_posts
+
+# =============================================================================
+# Cube Settings
+# =============================================================================
+# One row per (author, day of week, hour, feature-flag combination) holding, per
+# metric, the count, sum and sum of squares plus a log-bucket histogram that acts
+# as a mergeable quantile sketch. All measures are additive, so the cube is updated
+# by adding the rows of new posts and subtracting the old version of changed ones.
+# The cube is stored next to the processed posts it summarizes (see cube_stage).
+CUBE_STAGE = "2_engagement_cube"
+DIMENSIONS = ["TL", "Day of Week", "Hour of Day", "Feature Flags"]
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+INPUT_COLUMNS = ["Post URL", "TL", "Day of Week", "Hour of Day", FLAGS_COLUMN] + METRICS
+
+# Bucket 0 holds values below 1; bucket b >= 1 holds [GAMMA^(b-1), GAMMA^b), so
+# quantiles are estimated within about +-(GAMMA - 1) / 2 relative error
+SKETCH_GAMMA = 1.4
+SKETCH_BUCKETS = 56  # Covers counts up to 1.4^55, about 100 million
+
+
+def cube_stage(posts_stage: str) -> str:
+    """Cube stage stored alongside a processed posts stage (same directory for absolute stages)."""
+    return os.path.join(os.path.dirname(posts_stage), CUBE_STAGE)
+
+
+def _sketch_columns(metric: str) -> list:
+    return [f"{metric} q{b:02d}" for b in range(SKETCH_BUCKETS)]
+
+
+def measure_columns(metric: str) -> list:
+    return [f"{metric} count", f"{metric} sum", f"{metric} sum_sq"] + _sketch_columns(metric)
+
+
+def sketch_bucket(values: np.ndarray) -> np.ndarray:
+    """Maps metric values to their sketch bucket."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        buckets = np.floor(np.log(np.maximum(values, 1.0)) / np.log(SKETCH_GAMMA)).astype(np.int64) + 1
+    buckets[values < 1] = 0
+    return np.clip(buckets, 0, SKETCH_BUCKETS - 1)
+
+
+# =============================================================================
+# Building and Updating
+# =============================================================================
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates post rows into cube cells.
+
+    Day and hour are the local posting-time columns of the extraction stage; posts
+    without a timestamp get day and hour -1.
+    """
+    keys = pd.DataFrame({
+        "TL": df["TL"].to_numpy(),
+        "Day of Week": df["Day of Week"].fillna(-1).astype("int8").to_numpy(),
+        "Hour of Day": df["Hour of Day"].fillna(-1).astype("int8").to_numpy(),
+        "Feature Flags": df[FLAGS_COLUMN].to_numpy() if FLAGS_COLUMN in df.columns else pack_flags(df)
+    })
+    cells, cell_keys = pd.MultiIndex.from_frame(keys).factorize()
+    n_cells = len(cell_keys)
+
+    parts = [cell_keys.to_frame(index=False, name=DIMENSIONS)]
+    for metric in METRICS:
+        values = df[metric].to_numpy(dtype="float64", na_value=np.nan)
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        parts.append(pd.DataFrame({
+            f"{metric} count": np.bincount(cells, weights=present, minlength=n_cells).astype(np.int64),
+            f"{metric} sum": np.bincount(cells, weights=filled, minlength=n_cells),
+            f"{metric} sum_sq": np.bincount(cells, weights=filled ** 2, minlength=n_cells)
+        }))
+        # Histogram of each cell, counted in one bincount over (cell, bucket) pairs
+        pairs = cells[present] * SKETCH_BUCKETS + sketch_bucket(values[present])
+        histograms = np.bincount(pairs, minlength=n_cells * SKETCH_BUCKETS).reshape(n_cells, SKETCH_BUCKETS)
+        parts.append(pd.DataFrame(histograms.astype(np.int32), columns=_sketch_columns(metric)))
+    return pd.concat(parts, axis=1)
+
+
+def update_cube(cube: pd.DataFrame, added: pd.DataFrame = None, removed: pd.DataFrame = None) -> pd.DataFrame:
+    """Adds the cells of `added` posts and subtracts those of `removed` ones; empty cells are dropped."""
+    parts = [cube]
+    if added is not None and len(added):
+        parts.append(build_cube(added))
+    if removed is not None and len(removed):
+        removed_cells = build_cube(removed)
+        parts.append(pd.concat([removed_cells[DIMENSIONS], -removed_cells.drop(columns=DIMENSIONS)], axis=1))
+    merged = pd.concat(parts, ignore_index=True).groupby(DIMENSIONS, sort=False, observed=True).sum().reset_index()
+    return merged[merged[[f"{metric} count" for metric in METRICS]].to_numpy().any(axis=1)].reset_index(drop=True)
+
+
+def sync_cube(df: pd.DataFrame, previous: pd.DataFrame = None, stage: str = CUBE_STAGE) -> pd.DataFrame:
+    """
+    Brings the cube stored as `stage` in line with the processed posts `df` and saves it.
+
+    With the previous processed posts, only new, removed and changed posts touch the
+    cube; otherwise it is rebuilt from all rows.
+    """
+    if previous is None or not os.path.exists(stage_path(stage)):
+        cube = build_cube(df)
+    else:
+        current = df[INPUT_COLUMNS].set_index("Post URL")
+        before = previous[INPUT_COLUMNS].drop_duplicates("Post URL", keep="last").set_index("Post URL")
+        common = current.index.intersection(before.index)
+        same = (pd.util.hash_pandas_object(current.loc[common], index=False).to_numpy()
+                == pd.util.hash_pandas_object(before.loc[common], index=False).to_numpy())
+        changed = common[~same]
+        added = current.loc[current.index.difference(before.index).union(changed)]
+        removed = before.loc[before.index.difference(current.index).union(changed)]
+        cube = update_cube(read_cube(stage), added.reset_index(), removed.reset_index())
+    write_stage(cube, stage, export_xlsx=False)
+    return cube
+
+
+def read_cube(stage: str = CUBE_STAGE) -> pd.DataFrame:
+    """
+    Loads the cube; one missing next to existing processed posts (e.g. from before the
+    cube was added) is built from them and saved first.
+    """
+    posts_stage = os.path.join(os.path.dirname(stage), POSTS_STAGE)
+    if not os.path.exists(stage_path(stage)) and os.path.exists(stage_path(posts_stage)):
+        print(f"Building the engagement cube from {posts_stage}")
+        return sync_cube(read_posts(posts_stage, columns=INPUT_COLUMNS), stage=stage)
+    return read_stage(stage)
+
+
+# =============================================================================
+# Queries
+# =============================================================================
+def sketch_quantiles(histograms: np.ndarray, q: float) -> np.ndarray:
+    """Estimates the q-quantile from each row of bucket counts (geometric bucket midpoint)."""
+    totals = histograms.sum(axis=1)
+    ranks = np.ceil(q * totals).clip(min=1)
+    buckets = (histograms.cumsum(axis=1) < ranks[:, None]).sum(axis=1)
+    estimates = np.where(buckets == 0, 0.0, SKETCH_GAMMA ** (buckets - 0.5))
+    return np.where(totals > 0, estimates, np.nan)
+
+
+def query(cube: pd.DataFrame, by: list, require: list = (), exclude: list = (), metrics: list = None,
+          quantiles: tuple = (0.5,)) -> pd.DataFrame:
+    """
+    Breakdown of engagement by any subset of the cube dimensions.
+
+    `require` / `exclude` are feature flag columns that must be set / unset (e.g.
+    require=["Contains Emoji"], exclude=["Contains Link"]). Returns per metric the post
+    count, mean, standard deviation and the requested sketch quantiles.
+    """
+    metrics = metrics or METRICS
+    flags = cube["Feature Flags"].to_numpy()
+    required, excluded = flag_bits(require), flag_bits(exclude)
+    cells = cube[((flags & required) == required) & ((flags & excluded) == 0)]
+
+    value_cols = [col for metric in metrics for col in measure_columns(metric)]
+    grouped = cells.groupby(by, observed=True)[value_cols].sum() if by else cells[value_cols].sum().to_frame().T
+
+    result = pd.DataFrame(index=grouped.index)
+    for metric in metrics:
+        count = grouped[f"{metric} count"].astype("float64")
+        mean = grouped[f"{metric} sum"] / count
+        variance = (grouped[f"{metric} sum_sq"] - count * mean ** 2) / (count - 1)
+        result[f"{metric} count"] = grouped[f"{metric} count"]
+        result[f"{metric} mean"] = mean
+        result[f"{metric} std"] = np.sqrt(variance.clip(lower=0))
+        histograms = grouped[_sketch_columns(metric)].to_numpy()
+        for q in quantiles:
+            result[f"{metric} p{round(q * 100):02d}"] = sketch_quantiles(histograms, q)
+    return result
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import shapiro
+
+from post_schema import FEATURE_FLAGS, METRICS
+from rank_engine import RankEngine
+
+# =============================================================================
+# Comparison Settings
+# =============================================================================
+# Every flag of post_schema.FEATURE_FLAGS is compared against every metric, and
+# the result table uses the flag's label.
+NORMALITY_SAMPLE = 5000  # Shapiro-Wilk p-values are unreliable above this sample size
+ALPHA = 0.05
+
+
+def _shapiro_p(values: np.ndarray) -> float:
+    """Shapiro-Wilk p-value of one group, on a seeded sample for large groups."""
+    values = values[~np.isnan(values)]
+    if len(values) < 3 or np.ptp(values) == 0:
+        return np.nan
+    if len(values) > NORMALITY_SAMPLE:
+        values = np.random.default_rng(0).choice(values, NORMALITY_SAMPLE, replace=False)
+    return float(shapiro(values)[1])
+
+
+# =============================================================================
+# Comparison Engine
+# =============================================================================
+def compare_features(df: pd.DataFrame, feature_cols: list = None, metrics: list = None,
+                     ranks: RankEngine = None) -> pd.DataFrame:
+    """
+    Compares every binary feature against every metric in one pass.
+
+    Group sizes and means come from one matrix product of the 0/1 flag matrix with
+    the metric matrix, and the Mann-Whitney tests share the ranks of each metric.
+    Returns one row per feature x metric with the group means, percentage change,
+    Shapiro-Wilk screen, U statistic and p-value. Pass `ranks` to share the metric ranks
+    with further tests on the same frame.
+    """
+    feature_cols = feature_cols or [col for col in FEATURE_FLAGS if col in df.columns]
+    metrics = metrics or METRICS
+
+    flags = (df[feature_cols].fillna(0).to_numpy() == 1).astype("float64")
+    values = df[metrics].to_numpy(dtype="float64", na_value=np.nan)
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+
+    # (feature x metric) counts and sums for the flagged and the unflagged rows
+    n_with = flags.T @ present
+    n_without = (1 - flags).T @ present
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_with = (flags.T @ filled) / n_with
+        mean_without = (filled.sum(axis=0) - flags.T @ filled) / n_without
+        pct_change = (mean_with - mean_without) / mean_without * 100
+
+    ranks = ranks or RankEngine(df, metrics)
+    u_stats = np.empty_like(mean_with)
+    p_values = np.empty_like(mean_with)
+    for j, metric in enumerate(metrics):
+        u_stats[:, j], p_values[:, j] = ranks.mann_whitney_many(metric, feature_cols)
+
+    is_flagged = flags.astype(bool)
+    rows = []
+    for i, feature in enumerate(feature_cols):
+        for j, metric in enumerate(metrics):
+            p_with = _shapiro_p(values[is_flagged[:, i], j])
+            p_without = _shapiro_p(values[~is_flagged[:, i], j])
+            rows.append({
+                "Feature": FEATURE_FLAGS.get(feature, feature),
+                "Metric": metric,
+                "N With": int(n_with[i, j]),
+                "N Without": int(n_without[i, j]),
+                "Mean With": mean_with[i, j],
+                "Mean Without": mean_without[i, j],
+                "Percentage Change": pct_change[i, j],
+                "Shapiro P With": p_with,
+                "Shapiro P Without": p_without,
+                "Normal": "Yes" if p_with > ALPHA and p_without > ALPHA else "No",
+                "U-Statistic": u_stats[i, j],
+                "P-Value": p_values[i, j],
+                "Significance": "Significant" if p_values[i, j] < ALPHA else "Not Significant"
+            })
+    return pd.DataFrame(rows)
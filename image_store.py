@@ -0,0 +1,154 @@
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# =============================================================================
+# Image Store Settings
+# =============================================================================
+# Images are downloaded over one pooled session by a few worker threads and
+# stored under the SHA-256 of their bytes, so an image shared by several posts
+# is kept once. manifest.jsonl maps each Post URL to its image hash, one line
+# appended per download (the last line of a post wins), so an interrupted run
+# keeps what it stored; posts already in it (with their file present) are skipped.
+IMAGE_DIR = os.environ.get("IMAGE_DIR", "images")
+DOWNLOAD_WORKERS = int(os.environ.get("DOWNLOAD_WORKERS", "4"))
+DOWNLOAD_RETRIES = 3  # For 429 / 5xx / connection errors, with exponential backoff
+DOWNLOAD_TIMEOUT = 10
+CHUNK_SIZE = 1024 * 1024
+MANIFEST_FILE = "manifest.jsonl"
+
+
+def make_session(workers: int = DOWNLOAD_WORKERS, retries: int = DOWNLOAD_RETRIES) -> requests.Session:
+    """Session whose connection pool fits `workers` threads and retries transient failures."""
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def image_extension(content_type: str) -> str:
+    """File extension of an image Content-Type ('.jpg' when unknown)."""
+    mime = (content_type or "").split(";")[0].strip().lower()
+    return {"image/jpeg": ".jpg"}.get(mime) or mimetypes.guess_extension(mime) or ".jpg"
+
+
+class ImageStore:
+    """
+    Content-addressed image store with a Post URL -> hash manifest.
+
+    `submit(post_url, image_url)` queues a download on the worker threads, each recorded in the
+    manifest as it finishes; `close()` waits for them and reports failures. Use as a context manager.
+    """
+
+    def __init__(self, directory: str = IMAGE_DIR, workers: int = DOWNLOAD_WORKERS,
+                 retries: int = DOWNLOAD_RETRIES):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = self._load_manifest()
+        self.session = make_session(workers, retries)
+        self._lock = threading.Lock()
+        self._futures = []
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="download")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load_manifest(self) -> dict:
+        """Replays manifest.jsonl; a line cut short by an interrupted write is ignored."""
+        manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    manifest[entry.pop("post_url")] = entry
+        return manifest
+
+    def path(self, post_url: str) -> str:
+        """Stored file of a post's image, or None when the post has none yet."""
+        entry = self.manifest.get(post_url)
+        return os.path.join(self.directory, entry["hash"] + entry["ext"]) if entry else None
+
+    def has(self, post_url: str) -> bool:
+        path = self.path(post_url)
+        return path is not None and os.path.exists(path)
+
+    # -------------------------------------------------------------------------
+    # Downloads
+    # -------------------------------------------------------------------------
+    def download(self, post_url: str, image_url: str) -> str:
+        """Streams one image into the store and records it for `post_url`; returns its path or None."""
+        tmp_path = None
+        try:
+            try:
+                with self.session.get(image_url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                    if response.status_code != 200:
+                        print(f"Failed to download {image_url} (HTTP {response.status_code})")
+                        return None
+                    ext = image_extension(response.headers.get("Content-Type"))
+                    digest = hashlib.sha256()
+                    fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+                    with os.fdopen(fd, "wb") as f:
+                        for chunk in response.iter_content(CHUNK_SIZE):
+                            digest.update(chunk)
+                            f.write(chunk)
+            except requests.RequestException as e:
+                print(f"Error downloading image {image_url}: {e}")
+                return None
+
+            image_hash = digest.hexdigest()
+            path = os.path.join(self.directory, image_hash + ext)
+            entry = {"hash": image_hash, "ext": ext, "image_url": image_url,
+                     "downloaded_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            with self._lock:
+                if not os.path.exists(path):
+                    os.replace(tmp_path, path)  # Otherwise the same bytes are already stored for another post
+                with open(self.manifest_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"post_url": post_url, **entry}) + "\n")
+                self.manifest[post_url] = entry
+        finally:
+            # Any failure (or a duplicate image) leaves no .part file behind
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        print(f"Downloaded: {path}")
+        return path
+
+    def submit(self, post_url: str, image_url: str):
+        """Queues a download unless the post's image is already stored; returns its future or None."""
+        if self.has(post_url):
+            return None
+        future = self._executor.submit(self.download, post_url, image_url)
+        self._futures.append(future)
+        return future
+
+    def close(self):
+        """Waits for the queued downloads and logs every one that raised."""
+        failed = 0
+        for future in self._futures:
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                print(f"Image download failed: {type(e).__name__}: {e}")
+        self._executor.shutdown(wait=True)
+        self.session.close()
+        if failed:
+            print(f"{failed} of {len(self._futures)} image downloads failed")
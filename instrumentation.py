@@ -0,0 +1,176 @@
+import atexit
+import functools
+import json
+import os
+import resource
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+# =============================================================================
+# Instrumentation Settings
+# =============================================================================
+# Every instrumented block appends one JSON line to PERF_LOG. Stages launched by
+# the pipeline runner share its PIPELINE_RUN_ID, so one run can be read back as a whole.
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+PERF_LOG = os.environ.get("PERF_LOG", os.path.join(BASE_PATH, "perf_metrics.jsonl"))
+RUN_ID = os.environ.get("PIPELINE_RUN_ID") or uuid.uuid4().hex[:12]
+# Optional profiler around each instrumented block: "cprofile" or "pyinstrument"
+PROFILER = os.environ.get("PROFILER", "").lower()
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(BASE_PATH, "profiles"))
+# Per-call timing of hot functions (e.g. extract_cta) is off unless requested
+INSTRUMENT_FUNCTIONS = os.environ.get("INSTRUMENT_FUNCTIONS", "0") == "1"
+
+
+def peak_rss_mb(usage=None) -> float:
+    """Peak resident set size in MB of this process, or of a child's wait4 usage (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = (usage or resource.getrusage(resource.RUSAGE_SELF)).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _reset_peak_rss() -> bool:
+    """Resets the kernel's peak RSS (VmHWM) of this process; False where /proc does not allow it."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _current_peak_rss_mb() -> float:
+    """VmHWM of this process in MB: the peak RSS since the last reset."""
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return peak_rss_mb()
+
+
+def write_record(record: dict):
+    record = {"run_id": RUN_ID, "pid": os.getpid(), "timestamp": time.time(), **record}
+    with open(PERF_LOG, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+
+# =============================================================================
+# Profiler Hook
+# =============================================================================
+_profiling = False
+
+
+@contextmanager
+def _profiled(name: str):
+    """Runs the block under the profiler selected by PROFILER and saves its report; nested blocks share it."""
+    global _profiling
+    if PROFILER not in ("cprofile", "pyinstrument") or _profiling:
+        yield
+        return
+    _profiling = True
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{name}-{RUN_ID}")
+    if PROFILER == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path + ".prof")
+            _profiling = False
+    else:
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(path + ".html", "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+            _profiling = False
+
+
+# =============================================================================
+# Stage Instrumentation
+# =============================================================================
+_open_blocks = []  # Peak RSS seen so far by each enclosing instrumented block
+
+
+@contextmanager
+def instrument(name: str, rows_in: int = None):
+    """
+    Records wall time, CPU time, peak RSS and row throughput of a block.
+
+    The yielded dict can be updated inside the block, e.g. `record["rows_out"] = len(df)`.
+    The record is written even when the block raises, with the error type.
+
+    On Linux the peak RSS is that of the block alone: the kernel's high-water mark is reset
+    when a block starts, after folding the peak so far into the enclosing blocks. Elsewhere
+    it is the process-lifetime peak, marked by "peak_rss_scope": "process".
+    """
+    record = {"stage": name, "rows_in": rows_in, "rows_out": None}
+    if _open_blocks and _open_blocks[0] is not None:
+        current = _current_peak_rss_mb()
+        _open_blocks[:] = [max(peak, current) for peak in _open_blocks]
+    per_block = _reset_peak_rss()
+    _open_blocks.append(0.0 if per_block else None)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        with _profiled(name):
+            yield record
+    except BaseException as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        wall = time.perf_counter() - wall_start
+        rows = record["rows_out"] if record["rows_out"] is not None else record["rows_in"]
+        block_peak = _open_blocks.pop()
+        peak = max(block_peak, _current_peak_rss_mb()) if per_block else peak_rss_mb()
+        record.update({
+            "wall_s": round(wall, 4),
+            "cpu_s": round(time.process_time() - cpu_start, 4),
+            "peak_rss_mb": round(peak, 1),
+            "peak_rss_scope": "block" if per_block else "process",
+            "rows_per_s": round(rows / wall, 1) if rows and wall > 0 else None
+        })
+        write_record(record)
+
+
+# =============================================================================
+# Hot Function Timing
+# =============================================================================
+_function_stats = {}
+
+
+def timed(name: str = None):
+    """
+    Accumulates call count and time of a per-row function, written as one record at exit.
+
+    A no-op unless INSTRUMENT_FUNCTIONS=1, so hot paths pay nothing by default.
+    """
+    def decorator(func):
+        if not INSTRUMENT_FUNCTIONS:
+            return func
+        stats = _function_stats.setdefault(name or func.__name__, [0, 0.0])
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats[0] += 1
+                stats[1] += time.perf_counter() - start
+        return wrapper
+    return decorator
+
+
+@atexit.register
+def _flush_function_stats():
+    for name, (calls, seconds) in _function_stats.items():
+        if calls:
+            write_record({"function": name, "calls": calls, "total_s": round(seconds, 4),
+                          "mean_us": round(seconds / calls * 1e6, 2)})
@@ -1,24 +1,57 @@
+import asyncio
 import time
 import csv
 import json
 import os
+import re
+import urllib.parse
+from html import unescape
+import aiohttp
 from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
+from browser_profile import (LISTINGS_READY, NEXT_DATA_READY, apply_block_profile, configure_options,
+                             wait_until_ready)
+from crawl_state import CrawlState
+from debug_capture import DebugCapture
+from dom_extract import LISTING_PATTERNS, extract_card_links
+from driver_pool import DriverPool
 
-SEARCH_URL = "https://www.metrocuadrado.com/apartamento-apartaestudio-casa/venta/nuevo/bogota?search=form"
+# The search URL can point to a local stub server serving recorded pages
+SEARCH_URL = os.environ.get("METROCUADRADO_SEARCH_URL",
+                            "https://www.metrocuadrado.com/apartamento-apartaestudio-casa/venta/nuevo/bogota?search=form")
 MAX_PAGES = 3
 OUTPUT_FILE = "metrocuadrado_properties.csv"
 HEADLESS = True
-DEBUG_DIR = "debug_screenshots"
+BLOCK_PROFILE = os.environ.get("BLOCK_PROFILE", "data")  # Resources blocked in the browser, see browser_profile
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36"
 
-if not os.path.exists(DEBUG_DIR):
-    os.makedirs(DEBUG_DIR)
+# "http" reads the __NEXT_DATA__ JSON of each page over plain HTTP; listings (or search
+# pages) it cannot read go to Selenium when SELENIUM_FALLBACK is on. "selenium" uses the browser only.
+FETCH_MODE = os.environ.get("FETCH_MODE", "http")
+SELENIUM_FALLBACK = os.environ.get("SELENIUM_FALLBACK", "1") == "1"
+HTTP_CONCURRENCY = int(os.environ.get("HTTP_CONCURRENCY", "8"))  # Requests in flight
+HOST_RATE_LIMIT = float(os.environ.get("HOST_RATE_LIMIT", "2"))  # Requests per second per host
+HTTP_TIMEOUT = 20
+HTTP_RETRIES = 3  # Attempts for 429 / 5xx / network errors, with exponential backoff
+SEARCH_PAGE_PARAM = "page"  # Query parameter of the search page number when no next link is found
+NEXT_DATA_PATTERN = re.compile(r'<script[^>]*id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.DOTALL)
+HREF_PATTERN = re.compile(r'<a\b[^>]*?href=["\']([^"\']+)["\'][^>]*>', re.IGNORECASE)
+NEXT_LINK_PATTERN = re.compile(r'<a\b(?=[^>]*aria-label=["\']Siguiente página["\'])[^>]*?href=["\']([^"\']+)["\']',
+                               re.IGNORECASE)
+LISTING_FIELDS = [
+    "url", "title", "price", "currency", "location", "neighborhood", "city", "property_type", "area", "rooms",
+    "bathrooms", "parking", "stratum", "status", "description", "features", "broker", "broker_phone", "images",
+    "virtual_tour", "property_id", "scraped_at"
+]
+
+# Screenshots / HTML of failures (DEBUG_LEVEL=errors) or of every step (full), written in the background
+debug = DebugCapture()
 
 def init_driver():
     chrome_options = Options()
@@ -29,79 +62,120 @@ def init_driver():
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36")
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
+    configure_options(chrome_options)
     service = Service(ChromeDriverManager().install())
     driver = webdriver.Chrome(service=service, options=chrome_options)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    apply_block_profile(driver, BLOCK_PROFILE)
     return driver
 
-def take_screenshot(driver, name):
-    timestamp = time.strftime("%Y%m%d-%H%M%S")
-    filename = f"{DEBUG_DIR}/{name}_{timestamp}.png"
-    driver.save_screenshot(filename)
-    print(f"Saved screenshot: {filename}")
-    return filename
+def parse_listing(url, json_data):
+    """Maps the listing of a detail page's __NEXT_DATA__ JSON to an output row; None if it has none."""
+    listing = json_data.get('props', {}).get('pageProps', {}).get('listing', {})
+    if not listing:
+        return None
+    location = listing.get('location', {})
+    broker = listing.get('broker', {})
+    images = [img.get('url', '') for img in listing.get('images', []) if img.get('url')]
+    return {
+        "url": url,
+        "title": listing.get('title', ''),
+        "price": listing.get('price', {}).get('value', ''),
+        "currency": listing.get('price', {}).get('currency', 'COP'),
+        "location": location.get('formattedAddress', ''),
+        "neighborhood": location.get('neighborhood', {}).get('name', ''),
+        "city": location.get('city', {}).get('name', ''),
+        "property_type": listing.get('propertyType', ''),
+        "area": listing.get('area', ''),
+        "rooms": listing.get('rooms', ''),
+        "bathrooms": listing.get('bathrooms', ''),
+        "parking": listing.get('parking', ''),
+        "stratum": listing.get('stratum', ''),
+        "status": listing.get('status', ''),
+        "description": listing.get('description', '')[:500].replace('\n', ' ') + "...",
+        "features": ", ".join(listing.get('features', [])),
+        "broker": broker.get('name', ''),
+        "broker_phone": broker.get('phone', ''),
+        "images": "; ".join(images),
+        "virtual_tour": listing.get('virtualTourUrl', ''),
+        "property_id": listing.get('id', ''),
+        "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def is_listing_url(href):
+    return any(pattern in href for pattern in LISTING_PATTERNS)
+
+class ListingWriter:
+    """Appends rows to the output CSV as they are scraped; the header is written once per file."""
+
+    def __init__(self, path=OUTPUT_FILE):
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=LISTING_FIELDS)
+        if new_file:
+            self.writer.writeheader()
+        self.count = 0
+
+    def write(self, row):
+        self.writer.writerow(row)
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+def record_listing(state, writer, url, property_data):
+    """Streams a scraped row to the output, then checkpoints the listing in the crawl state."""
+    if property_data:
+        writer.write(property_data)
+        state.mark_listing(url, property_data.get("property_id"), "done")
+    else:
+        state.mark_listing(url, status="failed")
 
 def scrape_property_page(driver, url):
+    """Reads one listing in the browser; browser failures (WebDriverException) go to the pool's crash retry."""
     print(f"Scraping property: {url}")
     driver.get(url)
+    # The listing data ships in the initial HTML, so the page is ready as soon as its script exists
+    if not wait_until_ready(driver, NEXT_DATA_READY):
+        print("  - __NEXT_DATA__ did not appear")
+        debug.capture(driver, "no_next_data", error=True)
+        return None
     try:
-        try:
-            WebDriverWait(driver, 15).until(
-                EC.visibility_of_element_located((By.XPATH, "//h1[@data-testid='title-listing-detail']"))
-            )
-        except TimeoutException:
-            WebDriverWait(driver, 15).until(
-                EC.visibility_of_element_located((By.XPATH, "//div[@class='listing-detail']"))
-            )
         script_element = driver.find_element(By.XPATH, "//script[@id='__NEXT_DATA__']")
         json_data = json.loads(script_element.get_attribute('textContent'))
-        page_props = json_data.get('props', {}).get('pageProps', {})
-        listing = page_props.get('listing', {})
-        if not listing:
-            print("  - No listing data found in JSON")
-            take_screenshot(driver, "no_listing_data")
-            return None
-        location = listing.get('location', {})
-        broker = listing.get('broker', {})
-        images = [img.get('url', '') for img in listing.get('images', []) if img.get('url')]
-        return {
-            "url": url,
-            "title": listing.get('title', ''),
-            "price": listing.get('price', {}).get('value', ''),
-            "currency": listing.get('price', {}).get('currency', 'COP'),
-            "location": location.get('formattedAddress', ''),
-            "neighborhood": location.get('neighborhood', {}).get('name', ''),
-            "city": location.get('city', {}).get('name', ''),
-            "property_type": listing.get('propertyType', ''),
-            "area": listing.get('area', ''),
-            "rooms": listing.get('rooms', ''),
-            "bathrooms": listing.get('bathrooms', ''),
-            "parking": listing.get('parking', ''),
-            "stratum": listing.get('stratum', ''),
-            "status": listing.get('status', ''),
-            "description": listing.get('description', '')[:500].replace('\n', ' ') + "...",
-            "features": ", ".join(listing.get('features', [])),
-            "broker": broker.get('name', ''),
-            "broker_phone": broker.get('phone', ''),
-            "images": "; ".join(images),
-            "virtual_tour": listing.get('virtualTourUrl', ''),
-            "property_id": listing.get('id', ''),
-            "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
-    except Exception as e:
-        print(f"  - Error scraping property: {str(e)}")
-        take_screenshot(driver, "property_error")
+        property_data = parse_listing(url, json_data)
+    except (NoSuchElementException, AttributeError, KeyError, TypeError, ValueError) as e:
+        print(f"  - Error parsing property: {str(e)}")
+        debug.capture(driver, "property_error", error=True)
         return None
+    if not property_data:
+        print("  - No listing data found in JSON")
+        debug.capture(driver, "no_listing_data", error=True)
+    return property_data
+
+def wait_for_listings(driver, timeout=15):
+    if not wait_until_ready(driver, LISTINGS_READY, timeout=timeout):
+        print("Listing container did not appear")
 
-def scrape_search_results(driver):
-    print(f"Navigating to search page: {SEARCH_URL}")
-    driver.get(SEARCH_URL)
-    time.sleep(3)
-    take_screenshot(driver, "initial_page")
+def scrape_search_results(driver, state, writer, pool):
+    """
+    Walks the search page frontier in `driver`, from its first pending page; the due listings
+    of each page are fanned out to the browser pool. A page is checkpointed once its next page
+    is in the frontier, so an interrupted crawl resumes at the page it stopped on.
+    """
+    pending = state.pending_search_pages()
+    if not pending:
+        return writer.count
+    page_url, page = pending[0]
+    print(f"Navigating to search page {page}: {page_url}")
+    pool.rate_limiter.wait()
+    driver.get(page_url)
+    wait_for_listings(driver)
+    debug.capture(driver, "initial_page")
     try:
         accept_button = WebDriverWait(driver, 5).until(
             EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Aceptar todo')]"))
@@ -109,11 +183,9 @@ def scrape_search_results(driver):
         accept_button.click()
         print("Accepted cookies")
         time.sleep(1)
-        take_screenshot(driver, "after_cookies")
+        debug.capture(driver, "after_cookies")
     except:
         print("No cookie dialog found")
-    properties = []
-    page = 1
     while page <= MAX_PAGES:
         try:
             print(f"\n{'=' * 50}")
@@ -123,59 +195,28 @@ def scrape_search_results(driver):
             for _ in range(2):
                 driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                 time.sleep(2)
-            take_screenshot(driver, f"after_scroll_page_{page}")
-            cards = []
+            debug.capture(driver, f"after_scroll_page_{page}")
+            # One script call tries the card selectors in the browser and returns all card links
             print("Attempting to locate property cards...")
-            try:
-                cards = driver.find_elements(By.CSS_SELECTOR, "div[data-testid='m2-card-listings-container']")
-                print(f"Found {len(cards)} listings using data-testid method")
-            except NoSuchElementException:
-                print("No listings found using data-testid method")
-            if not cards:
-                try:
-                    cards = driver.find_elements(By.CSS_SELECTOR, "div.m2-card-listing")
-                    print(f"Found {len(cards)} listings using class-based method")
-                except NoSuchElementException:
-                    print("No listings found using class-based method")
-            if not cards:
-                try:
-                    cards = driver.find_elements(By.CSS_SELECTOR, "div[class*='card']")
-                    print(f"Found {len(cards)} listings using generic card method")
-                except NoSuchElementException:
-                    print("No listings found using generic card method")
-            if not cards:
+            cards = extract_card_links(driver)
+            if cards["strategy"]:
+                print(f"Found {cards['cards']} listings using {cards['strategy']} method")
+            else:
                 print("No property cards found on the page")
-                page_source = driver.page_source
-                with open(f"{DEBUG_DIR}/page_{page}_source.html", "w", encoding="utf-8") as f:
-                    f.write(page_source)
-                print(f"Saved page source to {DEBUG_DIR}/page_{page}_source.html")
-                take_screenshot(driver, f"no_cards_page_{page}")
+                debug.capture(driver, f"no_cards_page_{page}", error=True)
                 break
-            links = []
-            for card in cards:
-                try:
-                    try:
-                        link = card.find_element(By.TAG_NAME, "a")
-                    except NoSuchElementException:
-                        link = card.find_element(By.CSS_SELECTOR, "a")
-                    href = link.get_attribute('href')
-                    if href and ("/inmueble/" in href or "/proyecto/" in href):
-                        links.append(href)
-                except Exception as e:
-                    print(f"  - Error extracting link: {str(e)}")
-                    continue
-            links = list(set(links))
+            links = cards["links"]
             print(f"Found {len(links)} unique listing URLs")
             if not links:
                 print("No valid links found - stopping")
-                take_screenshot(driver, "no_valid_links")
+                debug.capture(driver, "no_valid_links", error=True)
                 break
-            for i, url in enumerate(links, 1):
-                print(f"\nProcessing property {i}/{len(links)}: {url[:70]}...")
-                property_data = scrape_property_page(driver, url)
-                if property_data:
-                    properties.append(property_data)
-                time.sleep(2)
+            state.add_listings(links, page)
+            due = state.due_listings(links)
+            print(f"{len(links) - len(due)} listings fetched within the freshness window are skipped")
+            for i, (url, property_data) in enumerate(pool.map(scrape_property_page, due), 1):
+                print(f"Processed property {i}/{len(due)}: {url[:70]}...")
+                record_listing(state, writer, url, property_data)
             if page < MAX_PAGES:
                 print("Attempting to navigate to next page...")
                 try:
@@ -187,49 +228,193 @@ def scrape_search_results(driver):
                         except:
                             next_button = driver.find_element(By.XPATH, "//a[contains(text(), 'Siguiente')]")
                     if next_button:
+                        # The next page enters the frontier before this one is checkpointed as done
+                        next_href = next_button.get_attribute("href") or ""
+                        next_url = next_href if next_href.startswith("http") else search_page_url(page_url, page + 1)
+                        state.add_search_page(next_url, page + 1)
+                        state.mark_search_page(page_url)
                         driver.execute_script("arguments[0].scrollIntoView();", next_button)
+                        pool.rate_limiter.wait()
                         driver.execute_script("arguments[0].click();", next_button)
-                        WebDriverWait(driver, 15).until(
-                            EC.presence_of_element_located((By.XPATH,
-                                                            "//div[contains(@class, 'm2-card-listing') or @data-testid='m2-card-listings-container']"))
-                        )
-                        time.sleep(3)
-                        page += 1
-                        take_screenshot(driver, f"after_navigation_page_{page}")
+                        wait_for_listings(driver)
+                        page_url, page = next_url, page + 1
+                        debug.capture(driver, f"after_navigation_page_{page}")
                     else:
                         print("Next page button not found - stopping pagination")
+                        state.mark_search_page(page_url)
                         break
                 except Exception as e:
                     print(f"Error navigating to next page: {str(e)}")
-                    take_screenshot(driver, "next_page_error")
+                    debug.capture(driver, "next_page_error", error=True)
                     break
             else:
+                state.mark_search_page(page_url)
                 break
         except Exception as e:
             print(f"Error processing page {page}: {str(e)}")
-            take_screenshot(driver, f"page_{page}_error")
+            debug.capture(driver, f"page_{page}_error", error=True)
             break
-    return properties
+    return writer.count
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least 1 / rate seconds apart."""
+
+    def __init__(self, rate=HOST_RATE_LIMIT):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = {}
+        self.locks = {}
+
+    async def wait(self, url):
+        host = urllib.parse.urlsplit(url).netloc
+        async with self.locks.setdefault(host, asyncio.Lock()):
+            now = asyncio.get_running_loop().time()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+async def fetch_html(session, limiter, url):
+    """GETs a page; 429, 5xx and network errors are retried with exponential backoff."""
+    for attempt in range(HTTP_RETRIES):
+        await limiter.wait(url)
+        try:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                return await response.text()
+        except aiohttp.ClientResponseError as e:
+            if (e.status != 429 and e.status < 500) or attempt == HTTP_RETRIES - 1:
+                raise
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == HTTP_RETRIES - 1:
+                raise
+        await asyncio.sleep(2 ** attempt)
+
+def extract_next_data(page_html):
+    match = NEXT_DATA_PATTERN.search(page_html)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return None
+
+def parse_search_page(page_html, page_url):
+    """Returns the unique listing URLs of a search page and the URL of its next page link, if any."""
+    hrefs = (urllib.parse.urljoin(page_url, unescape(href)) for href in HREF_PATTERN.findall(page_html))
+    links = list(dict.fromkeys(href for href in hrefs if is_listing_url(href)))
+    next_match = NEXT_LINK_PATTERN.search(page_html)
+    return links, urllib.parse.urljoin(page_url, unescape(next_match.group(1))) if next_match else None
+
+def search_page_url(url, page):
+    parts = urllib.parse.urlsplit(url)
+    query = dict(urllib.parse.parse_qsl(parts.query))
+    query[SEARCH_PAGE_PARAM] = str(page)
+    return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query)))
+
+async def fetch_listing(session, limiter, semaphore, url):
+    """
+    Returns (url, row, retry). The row is None when the page could not be fetched or parsed;
+    retry says whether the browser may still read it (fetch errors, no listing JSON).
+    """
+    async with semaphore:
+        try:
+            page_html = await fetch_html(session, limiter, url)
+        except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeDecodeError) as e:
+            print(f"  - HTTP error for {url}: {str(e)}")
+            return url, None, True
+    try:
+        json_data = extract_next_data(page_html)
+        return url, parse_listing(url, json_data) if json_data else None, True
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        # The listing JSON is there but not in the expected shape; the browser would read the same
+        print(f"  - Could not parse listing {url}: {type(e).__name__}: {str(e)}")
+        return url, None, False
+
+async def crawl_http(state, writer):
+    """
+    Walks the search page frontier over HTTP and fetches the due listings of each page concurrently.
+
+    Returns the listing URLs left for the Selenium fallback, and whether the search pages
+    need the browser (no listing links in their HTML).
+    """
+    limiter = HostRateLimiter()
+    semaphore = asyncio.Semaphore(HTTP_CONCURRENCY)
+    fallback = []
+    async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=HTTP_CONCURRENCY),
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+            headers={"User-Agent": USER_AGENT, "Accept-Language": "es-CO,es;q=0.9"}) as session:
+        while state.pending_search_pages():
+            page_url, page = state.pending_search_pages()[0]
+            print(f"\nFetching search page {page}/{MAX_PAGES}: {page_url}")
+            try:
+                page_html = await fetch_html(session, limiter, page_url)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Error fetching search page {page}: {str(e)}")
+                return fallback, True
+            links, next_url = parse_search_page(page_html, page_url)
+            if not links:
+                print(f"No listing links in the HTML of search page {page}")
+                return fallback, True
+            state.add_listings(links, page)
+            due = state.due_listings(links)
+            print(f"Found {len(links)} unique listing URLs, {len(links) - len(due)} fetched within the freshness window")
+            tasks = [fetch_listing(session, limiter, semaphore, url) for url in due]
+            for task in asyncio.as_completed(tasks):
+                url, property_data, retry = await task
+                if property_data or not retry:
+                    record_listing(state, writer, url, property_data)
+                else:
+                    fallback.append(url)
+            # The next page enters the frontier before this one is checkpointed as done
+            if page < MAX_PAGES:
+                state.add_search_page(next_url or search_page_url(page_url, page + 1), page + 1)
+            state.mark_search_page(page_url)
+    return fallback, False
 
 def main():
     print("Starting MetroCuadrado scraper with enhanced debugging...")
-    driver = init_driver()
+    state = CrawlState()
+    writer = ListingWriter()
+    driver = None
+    pool = None
     try:
-        results = scrape_search_results(driver)
-        if results:
-            with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=results[0].keys())
-                writer.writeheader()
-                writer.writerows(results)
-            print(f"\nSuccess! Saved {len(results)} properties to {OUTPUT_FILE}")
+        if state.start_crawl(SEARCH_URL):
+            print("Resuming the interrupted crawl")
+        fallback, browser_search = [], FETCH_MODE == "selenium"
+        if FETCH_MODE == "http":
+            fallback, browser_search = asyncio.run(crawl_http(state, writer))
+            browser_search = browser_search and SELENIUM_FALLBACK
+        if browser_search or (fallback and SELENIUM_FALLBACK):
+            pool = DriverPool(init_driver)
+        if browser_search:
+            driver = init_driver()
+            scrape_search_results(driver, state, writer, pool)
+        if pool is None:
+            for url in fallback:
+                state.mark_listing(url, status="failed")
+        else:
+            for i, (url, property_data) in enumerate(pool.map(scrape_property_page, fallback), 1):
+                print(f"Selenium fallback {i}/{len(fallback)}: {url[:70]}...")
+                record_listing(state, writer, url, property_data)
+        if writer.count:
+            print(f"\nSuccess! Saved {writer.count} properties to {OUTPUT_FILE}")
         else:
             print("No data scraped")
     except Exception as e:
         print(f"Main error: {str(e)}")
-        take_screenshot(driver, "main_error")
+        if driver is not None:
+            debug.capture(driver, "main_error", error=True)
     finally:
-        driver.quit()
-        print("Browser closed")
+        writer.close()
+        state.close()
+        debug.close()
+        if pool is not None:
+            pool.close()
+        if driver is not None:
+            driver.quit()
+        if pool is not None or driver is not None:
+            print("Browsers closed")
 
 if __name__ == "__main__":
     main()
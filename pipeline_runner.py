@@ -0,0 +1,256 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from instrumentation import RUN_ID, peak_rss_mb, write_record
+
+# =============================================================================
+# Stage Graph
+# =============================================================================
+# Each stage is one of the numbered scripts with the files it reads and writes.
+# A stage re-runs only when the content hash of its script, the local modules it
+# imports (transitively), its inputs or the environment settings it reads changed;
+# stages whose dependencies are all done run concurrently in a process pool.
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = os.path.join(BASE_PATH, ".pipeline_state.json")
+RAW_INPUT = os.environ.get("CLEANING_INPUT", "0_data_set.xlsx")
+TIMEZONE_FILE = os.environ.get("TIMEZONE_FILE", "")
+CTA_PHRASE_FILES = [path for path in os.environ.get("CTA_PHRASE_FILES", "").split(os.pathsep) if path]
+WATCH_INTERVAL = 2.0  # Seconds between checks of the raw input in watch mode
+
+
+@dataclass
+class Stage:
+    name: str
+    script: str
+    inputs: list
+    outputs: list
+    env: list = field(default_factory=list)  # Environment variables that change the stage's outputs
+
+
+STAGES = [
+    Stage("clean", "1_Data Cleaning.py", [RAW_INPUT], ["1_data_set_cleaned.parquet"],
+          ["CLEANING_MODE", "CLEANING_INPUT", "EXPORT_AUDIT_SHEETS"]),
+    Stage("extract", "2_Data Extraction.py",
+          ["1_data_set_cleaned.parquet", "1_data_set_cleaned.parts"] + ([TIMEZONE_FILE] if TIMEZONE_FILE else [])
+          + CTA_PHRASE_FILES,
+          ["2_processed_linkedin_data.parquet", "2_engagement_cube.parquet"], ["TIMEZONE_FILE", "CTA_PHRASE_FILES"]),
+    Stage("author", "3a_Author_analysis.py", ["2_engagement_cube.parquet"],
+          ["3a_author_mean_engagement.xlsx"]),
+    Stage("features", "3b_Feature_Comparison.py", ["2_processed_linkedin_data.parquet"],
+          ["3b_feature_comparison.xlsx", "3b_feature_comparison_plot.png"]),
+    Stage("day", "3c_Day_Analysis.py", ["2_processed_linkedin_data.parquet"],
+          ["3c_interactions_by_day_tests.xlsx"]),
+    Stage("hour", "3d_Hour_Analysis.py", ["2_processed_linkedin_data.parquet"],
+          ["3d_normalized_interactions_by_hour.xlsx", "3d_interactions_by_hour_tests.xlsx"]),
+    Stage("sentiment", "3k_Sentiment_Analysis.py", ["2_processed_linkedin_data.parquet"],
+          ["3k_Sentiment_Analysis.xlsx"]),
+    # All Dunn's Test heatmaps in one pool; unchanged matrices are skipped by their own hash
+    Stage("heatmaps", "dunn_heatmaps.py",
+          ["3c_interactions_by_day_tests.xlsx", "3d_interactions_by_hour_tests.xlsx", "3b_feature_comparison.xlsx"],
+          ["3c_a_dunn_heatmap_reactions.png", "3d_dunn_heatmap_reactions.png", "3e_a_dunn_heatmap_reactions.png"]),
+]
+COMMON_ENV = ["EXPORT_XLSX"]  # Read by pipeline_store for every stage that writes a stage file
+
+
+def _dependencies(stages: list) -> dict:
+    """Maps each stage name to the stages producing one of its inputs."""
+    producers = {output: stage.name for stage in stages for output in stage.outputs}
+    producers.update({output.replace(".parquet", ".parts"): stage.name
+                      for stage in stages for output in stage.outputs if output.endswith(".parquet")})
+    return {stage.name: {producers[i] for i in stage.inputs if i in producers} - {stage.name} for stage in stages}
+
+
+def downstream(stages: list, names: set) -> set:
+    """Returns `names` plus every stage depending on them, directly or transitively."""
+    deps = _dependencies(stages)
+    affected = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for name, needs in deps.items():
+            if name not in affected and needs & affected:
+                affected.add(name)
+                changed = True
+    return affected
+
+
+# =============================================================================
+# Content Hashing
+# =============================================================================
+def _hash_path(digest, path: str):
+    """Feeds a file, or every file of a directory in sorted order, into the digest."""
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode())
+                _hash_path(digest, file_path)
+    elif os.path.exists(path):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    else:
+        digest.update(b"<missing>")
+
+
+def local_modules(script: str) -> list:
+    """Returns the project modules a script imports, directly or through other project modules."""
+    found, queue = set(), [script]
+    while queue:
+        with open(os.path.join(BASE_PATH, queue.pop()), encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = name.split(".")[0] + ".py"
+                if module not in found and os.path.exists(os.path.join(BASE_PATH, module)):
+                    found.add(module)
+                    queue.append(module)
+    return sorted(found - {script})
+
+
+def stage_hash(stage: Stage) -> str:
+    """Content hash of a stage's script, imported project modules, inputs and environment settings."""
+    digest = hashlib.blake2b(digest_size=16)
+    for rel_path in [stage.script] + local_modules(stage.script) + stage.inputs:
+        digest.update(rel_path.encode())
+        _hash_path(digest, os.path.join(BASE_PATH, rel_path))
+    for name in COMMON_ENV + stage.env:
+        digest.update(f"{name}={os.environ.get(name)}".encode())
+    return digest.hexdigest()
+
+
+def load_state() -> dict:
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state: dict):
+    with open(STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def is_fresh(stage: Stage, state: dict) -> bool:
+    """A stage is fresh when its hash is unchanged and all of its outputs exist."""
+    return (state.get(stage.name) == stage_hash(stage)
+            and all(os.path.exists(os.path.join(BASE_PATH, output)) for output in stage.outputs))
+
+
+# =============================================================================
+# Execution
+# =============================================================================
+def run_script(script: str, run_id: str) -> tuple:
+    """
+    Runs one stage script headless in the project directory; returns (return code, seconds, error tail).
+
+    The child's CPU time and peak RSS come from wait4 and are written to the performance log.
+    """
+    env = dict(os.environ, MPLBACKEND="Agg", PIPELINE_RUN_ID=run_id)
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, script], cwd=BASE_PATH, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=stderr)
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        seconds = time.perf_counter() - start
+        stderr.seek(0)
+        error = stderr.read().decode("utf-8", errors="replace")[-2000:]
+
+    write_record({"stage": f"script:{script}", "wall_s": round(seconds, 4),
+                  "cpu_s": round(usage.ru_utime + usage.ru_stime, 4), "peak_rss_mb": round(peak_rss_mb(usage), 1),
+                  "exit_code": process.returncode})
+    return process.returncode, seconds, error
+
+
+def run_pipeline(stages: list = None, force: set = None, workers: int = None) -> dict:
+    """
+    Runs the stale stages in dependency order and returns {stage name: status}.
+
+    Stages whose dependencies have finished are submitted together, so the
+    independent analyses run concurrently. A failed stage skips its dependents.
+    Raises RuntimeError when the remaining stages wait on dependencies that can never finish.
+    """
+    stages = stages or STAGES
+    force = downstream(stages, force or set())
+    deps = _dependencies(stages)
+    state = load_state()
+    status = {}
+    pending = {stage.name: stage for stage in stages}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending:
+            ready = [s for s in pending.values() if all(d in status for d in deps[s.name])]
+            if not ready:
+                raise RuntimeError(f"Stages {sorted(pending)} wait on stages that never run: "
+                                   f"{sorted(set().union(*(deps[name] for name in pending)) - set(status))}")
+            to_run = []
+            for stage in ready:
+                del pending[stage.name]
+                if any(status[d] in ("failed", "blocked") for d in deps[stage.name]):
+                    status[stage.name] = "blocked"
+                elif stage.name not in force and is_fresh(stage, state):
+                    status[stage.name] = "skipped"
+                    print(f"[skip] {stage.name}: inputs unchanged")
+                else:
+                    to_run.append(stage)
+
+            futures = {stage.name: pool.submit(run_script, stage.script, RUN_ID) for stage in to_run}
+            for stage in to_run:
+                code, seconds, error = futures[stage.name].result()
+                if code == 0:
+                    state[stage.name] = stage_hash(stage)
+                    status[stage.name] = "ran"
+                    print(f"[done] {stage.name} in {seconds:.1f}s")
+                else:
+                    state.pop(stage.name, None)
+                    status[stage.name] = "failed"
+                    print(f"[fail] {stage.name} (exit {code}):\n{error}")
+            save_state(state)
+    return status
+
+
+def watch(workers: int = None, interval: float = WATCH_INTERVAL):
+    """Re-runs the pipeline whenever the raw input changes; unchanged stages are skipped by hash."""
+    raw_path = os.path.join(BASE_PATH, RAW_INPUT)
+    last_mtime = None
+    print(f"Watching {raw_path} (Ctrl+C to stop)")
+    try:
+        while True:
+            mtime = os.path.getmtime(raw_path) if os.path.exists(raw_path) else None
+            if mtime != last_mtime:
+                last_mtime = mtime
+                run_pipeline(workers=workers)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the pipeline stages whose inputs changed.")
+    parser.add_argument("--force", nargs="*", default=[], help="Stages to re-run (with their dependents)")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent stages (default: CPU count)")
+    parser.add_argument("--watch", action="store_true", help=f"Re-run when {RAW_INPUT} changes")
+    args = parser.parse_args()
+
+    if args.watch:
+        watch(workers=args.workers)
+    else:
+        results = run_pipeline(force=set(args.force), workers=args.workers)
+        sys.exit(1 if "failed" in results.values() else 0)
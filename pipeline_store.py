@@ -0,0 +1,173 @@
+import glob
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# =============================================================================
+# Stage Store Settings
+# =============================================================================
+# Parquet is the canonical hand-off between pipeline stages. The xlsx files are
+# only written when EXPORT_XLSX is enabled (e.g. EXPORT_XLSX=1 for a report run).
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+EXPORT_XLSX = os.environ.get("EXPORT_XLSX", "0") == "1"
+PARQUET_COMPRESSION = "zstd"
+
+# Script producing each stage, named in the error when a stage has not been run yet
+STAGE_PRODUCERS = {
+    "1_data_set_cleaned": "1_Data Cleaning.py",
+    "2_processed_linkedin_data": "2_Data Extraction.py",
+    "2_engagement_cube": "2_Data Extraction.py"
+}
+
+# Row key of each stage; appended parts supersede earlier rows with the same key
+STAGE_KEYS = {
+    "1_data_set_cleaned": "Post URL",
+    "2_processed_linkedin_data": "Post URL"
+}
+
+
+# =============================================================================
+# Path Helpers
+# =============================================================================
+def stage_path(stage: str, ext: str = "parquet") -> str:
+    """Returns the absolute path of a stage output, e.g. '2_processed_linkedin_data.parquet'."""
+    return os.path.join(BASE_PATH, f"{stage}.{ext}")
+
+
+def parts_dir(stage: str) -> str:
+    """Returns the directory holding the incremental parts appended to a stage."""
+    return os.path.join(BASE_PATH, f"{stage}.parts")
+
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Converts a DataFrame to an Arrow table, casting mixed object columns to strings."""
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        inferred = pd.api.types.infer_dtype(df[col], skipna=True)
+        if inferred.startswith("mixed"):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # pandas cannot parse the dtype names it records for nested Arrow types (e.g. lists of
+    # dictionary strings); those columns are restored by _from_arrow instead
+    metadata = json.loads(table.schema.metadata[b"pandas"])
+    for column in metadata["columns"]:
+        if column["pandas_type"].startswith("list"):
+            column["numpy_type"] = "object"
+    return table.replace_schema_metadata({**table.schema.metadata, b"pandas": json.dumps(metadata).encode()})
+
+
+def _from_arrow(table: pa.Table) -> pd.DataFrame:
+    """Converts an Arrow table to a DataFrame; list columns stay Arrow-backed instead of object arrays."""
+    return table.to_pandas(types_mapper=lambda t: pd.ArrowDtype(t) if pa.types.is_list(t) else None)
+
+
+def _decode_dictionaries(table: pa.Table) -> pa.Table:
+    """Casts dictionary columns (e.g. hive partition keys) to their value type, so they concatenate with parts."""
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+    return table
+
+
+def excel_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """Returns a copy with timezone-aware datetimes converted to naive UTC, which Excel requires."""
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.DatetimeTZDtype):
+            df[col] = df[col].dt.tz_convert("UTC").dt.tz_localize(None)
+    return df
+
+
+# =============================================================================
+# Read / Write
+# =============================================================================
+def write_stage(df: pd.DataFrame, stage: str, sheet_name: str = "Sheet1", extra_sheets: dict = None,
+                export_xlsx: bool = None, partition_cols: list = None) -> str:
+    """
+    Writes a stage output as Parquet and, if requested, as an xlsx export.
+
+    `extra_sheets` maps sheet names to DataFrames that only go into the xlsx export
+    (e.g. the removed duplicates of the cleaning stage). With `partition_cols` the
+    stage is written as a hive-partitioned Parquet directory (e.g. one per industry).
+    """
+    path = stage_path(stage)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    if partition_cols:
+        if os.path.exists(path):
+            os.remove(path)
+        pq.write_to_dataset(_to_arrow(df), path, partition_cols=partition_cols, compression=PARQUET_COMPRESSION)
+    else:
+        pq.write_table(_to_arrow(df), path, compression=PARQUET_COMPRESSION)
+    # A full write replaces all previously appended parts
+    shutil.rmtree(parts_dir(stage), ignore_errors=True)
+
+    if EXPORT_XLSX if export_xlsx is None else export_xlsx:
+        with pd.ExcelWriter(stage_path(stage, "xlsx"), engine="xlsxwriter") as writer:
+            excel_safe(df).to_excel(writer, sheet_name=sheet_name, index=False)
+            for extra_name, extra_df in (extra_sheets or {}).items():
+                excel_safe(extra_df).to_excel(writer, sheet_name=extra_name, index=False)
+    return path
+
+
+def append_stage(df: pd.DataFrame, stage: str) -> str:
+    """
+    Appends rows to a stage as a new Parquet part, without rewriting earlier output.
+
+    Rows whose STAGE_KEYS key already exists supersede the earlier rows when read.
+    """
+    os.makedirs(parts_dir(stage), exist_ok=True)
+    path = os.path.join(parts_dir(stage), f"part-{time.time_ns()}.parquet")
+    pq.write_table(_to_arrow(df), path, compression=PARQUET_COMPRESSION)
+    return path
+
+
+def read_stage(stage: str, columns: list = None) -> pd.DataFrame:
+    """
+    Loads a stage output, reading only `columns` if given.
+
+    The Parquet file is memory-mapped and appended parts are merged in, keeping the
+    latest row per key. The xlsx export is never read back: a stage without Parquet
+    output raises FileNotFoundError naming the script to run.
+    """
+    path = stage_path(stage)
+    parts = sorted(glob.glob(os.path.join(parts_dir(stage), "part-*.parquet")))
+    if not parts:
+        if not os.path.exists(path):
+            producer = STAGE_PRODUCERS.get(os.path.basename(stage), "the stage's script")
+            raise FileNotFoundError(f"No Parquet output for stage {stage!r} ({path}); "
+                                    f"run {producer} or pipeline_runner.py first")
+        return _from_arrow(pq.read_table(path, columns=columns, memory_map=True))
+
+    key = STAGE_KEYS.get(stage)
+    read_columns = columns if columns is None or key is None or key in columns else columns + [key]
+    files = ([path] if os.path.exists(path) else []) + parts
+    tables = [_decode_dictionaries(pq.read_table(f, columns=read_columns, memory_map=True)) for f in files]
+    df = _from_arrow(pa.concat_tables(tables, promote_options="permissive"))
+    if key is not None:
+        df = df.drop_duplicates(subset=[key], keep="last").reset_index(drop=True)
+    return df[columns] if columns is not None else df
+
+
+def stage_columns(stage: str) -> list:
+    """
+    Column names of a stage's Parquet output, read from the file footers; empty if it does not exist.
+
+    A partitioned stage (CLEANING_MODE=all_sheets) is a hive directory whose partition
+    keys are part of the returned columns.
+    """
+    path = stage_path(stage)
+    if os.path.isdir(path):
+        return ds.dataset(path, format="parquet", partitioning="hive").schema.names
+    return pq.read_schema(path).names if os.path.exists(path) else []
+
+
+def compact_stage(stage: str) -> str:
+    """Merges the appended parts into the stage file."""
+    return write_stage(read_stage(stage), stage, export_xlsx=False)
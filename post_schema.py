@@ -0,0 +1,216 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from pipeline_store import EXPORT_XLSX, excel_safe, read_stage, stage_columns, stage_path, write_stage
+from sentiment_cache import SENTIMENT_COLUMNS
+
+# =============================================================================
+# Feature Flags and Metrics
+# =============================================================================
+# Binary (0/1) post features, with the label used in analysis results. A new flag
+# only needs a column and an entry here (bit order follows this dict).
+FEATURE_FLAGS = {
+    "CTA Present": "CTA",
+    "Nur Repost": "Repost",
+    "Contains Hashtag": "Hashtag",
+    "Contains Emoji": "Emoji",
+    "Contains Question": "Question",
+    "Contains Link": "Link",
+    "Contains Quote": "Quote"
+}
+METRICS = ["reactions", "comments", "shares"]
+
+# =============================================================================
+# Post Schema Settings
+# =============================================================================
+# Compact layout of the processed posts: authors and zones as categoricals, the
+# seven 0/1 feature columns packed into one uint16 bitmask (bit i = i-th entry of
+# FEATURE_FLAGS), int32 counts, float32 sentiment scores and the extracted tokens
+# as lists over a shared string dictionary instead of comma-joined strings.
+POSTS_STAGE = "2_processed_linkedin_data"
+FLAGS_COLUMN = "Feature Flags"
+TOKEN_COLUMNS = ["CTA Found", "Extracted Emojis"]
+TOKEN_SEPARATOR = ", "
+POSTS_SCHEMA = {
+    "TL": "category",
+    "Post Timezone": "category",
+    **{metric: "Int32" for metric in METRICS},
+    **{col: "float32" for col in SENTIMENT_COLUMNS},
+    FLAGS_COLUMN: "uint16"
+}
+
+
+# =============================================================================
+# Feature Bitmask
+# =============================================================================
+def pack_flags(df: pd.DataFrame) -> np.ndarray:
+    """Packs the FEATURE_FLAGS columns into one integer, bit i for the i-th flag."""
+    mask = np.zeros(len(df), dtype=np.uint16)
+    for bit, col in enumerate(FEATURE_FLAGS):
+        mask |= (df[col].fillna(0).to_numpy() == 1).astype(np.uint16) << bit
+    return mask
+
+
+def flag_bits(cols: list) -> int:
+    """Bitmask of the given flag columns, e.g. for require / exclude filters."""
+    names = list(FEATURE_FLAGS)
+    return sum(1 << names.index(col) for col in cols)
+
+
+def flag_view(flags, col: str) -> np.ndarray:
+    """Boolean view of one flag column from the packed bitmask."""
+    return (np.asarray(flags) & flag_bits([col])) != 0
+
+
+# =============================================================================
+# Token Encoding
+# =============================================================================
+def encode_tokens(joined: pd.Series) -> pd.Series:
+    """Turns comma-joined tokens ('', 'a', 'a, b') into a list column with dictionary-encoded items."""
+    lists = [text.split(TOKEN_SEPARATOR) if text else [] for text in joined.fillna("")]
+    flat = pa.array(lists, type=pa.list_(pa.string()))
+    encoded = pa.ListArray.from_arrays(flat.offsets, flat.values.dictionary_encode())
+    return pd.Series(pd.arrays.ArrowExtensionArray(encoded), index=joined.index, name=joined.name)
+
+
+def decode_tokens(tokens: pd.Series) -> pd.Series:
+    """Joins a token list column back into the comma-joined strings of the flat layout."""
+    return pd.Series([TOKEN_SEPARATOR.join(items) if items is not None else "" for items in tokens.tolist()],
+                     index=tokens.index, name=tokens.name, dtype="str")
+
+
+# =============================================================================
+# Compact / Expand
+# =============================================================================
+def compact_posts(df: pd.DataFrame) -> pd.DataFrame:
+    """Converts processed posts in the flat layout to the compact POSTS_SCHEMA layout."""
+    df = df.copy()
+    if FLAGS_COLUMN not in df.columns and any(col in df.columns for col in FEATURE_FLAGS):
+        position = df.columns.get_loc(next(col for col in df.columns if col in FEATURE_FLAGS))
+        flags = pack_flags(df)
+        df = df.drop(columns=[col for col in FEATURE_FLAGS if col in df.columns])
+        df.insert(position, FLAGS_COLUMN, flags)
+    for col in TOKEN_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.ArrowDtype):
+            df[col] = encode_tokens(df[col])
+    return df.astype({col: dtype for col, dtype in POSTS_SCHEMA.items() if col in df.columns})
+
+
+def expand_posts(df: pd.DataFrame) -> pd.DataFrame:
+    """Converts compact posts back to the flat layout: 0/1 flag columns and comma-joined tokens."""
+    df = df.copy()
+    if FLAGS_COLUMN in df.columns:
+        position = df.columns.get_loc(FLAGS_COLUMN)
+        flags = df.pop(FLAGS_COLUMN).to_numpy()
+        for offset, col in enumerate(FEATURE_FLAGS):
+            df.insert(position + offset, col, flag_view(flags, col).astype("int8"))
+    for col in TOKEN_COLUMNS:
+        if col in df.columns and isinstance(df[col].dtype, pd.ArrowDtype):
+            df[col] = decode_tokens(df[col])
+    return df
+
+
+# =============================================================================
+# Read / Write
+# =============================================================================
+def write_posts(df: pd.DataFrame, stage: str = POSTS_STAGE) -> tuple:
+    """Writes the posts in the compact layout; the optional xlsx export keeps the flat layout. Returns (compact frame, path)."""
+    compact = compact_posts(df)
+    path = write_stage(compact, stage, export_xlsx=False)
+    if EXPORT_XLSX:
+        excel_safe(expand_posts(compact)).to_excel(stage_path(stage, "xlsx"), index=False)
+    return compact, path
+
+
+def read_posts(stage: str = POSTS_STAGE, columns: list = None) -> pd.DataFrame:
+    """
+    Loads processed posts in the compact layout, reading only `columns` if given.
+
+    Requested flag columns (e.g. "Contains Emoji") are returned as boolean views of the
+    bitmask. Outputs written in the flat layout are converted on load.
+    """
+    flat = FLAGS_COLUMN not in stage_columns(stage)
+    flag_cols = [col for col in columns or [] if col in FEATURE_FLAGS]
+    read_columns = columns
+    if columns is not None:
+        read_columns = [col for col in columns if col not in FEATURE_FLAGS and col != FLAGS_COLUMN]
+        if flag_cols or FLAGS_COLUMN in columns:
+            read_columns += list(FEATURE_FLAGS) if flat else [FLAGS_COLUMN]
+
+    df = compact_posts(read_stage(stage, columns=read_columns))
+    if columns is None:
+        return df
+    for col in flag_cols:
+        df[col] = flag_view(df[FLAGS_COLUMN], col)
+    return df[columns]
+
+
+# =============================================================================
+# Combinational Queries
+# =============================================================================
+_FLAG_NAMES = {short.lower(): col for col, short in FEATURE_FLAGS.items()}
+_TOKEN_PATTERN = re.compile(r"\(|\)|[^\s()]+")
+
+
+def select(flags, expression: str) -> np.ndarray:
+    """
+    Evaluates a flag expression such as "emoji AND hashtag AND NOT link" on the bitmask
+    (or on a frame holding it).
+
+    Names are the short feature labels of FEATURE_FLAGS (CTA, Repost, Hashtag, Emoji,
+    Question, Link, Quote), case-insensitive; operators are AND, OR, NOT and parentheses,
+    with NOT binding tightest and AND before OR. Returns a boolean row mask.
+    """
+    if isinstance(flags, pd.DataFrame):
+        flags = flags[FLAGS_COLUMN]
+    flags = np.asarray(flags)
+    tokens = _TOKEN_PATTERN.findall(expression)
+    position = 0
+
+    def peek():
+        return tokens[position].upper() if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        mask = parse_and()
+        while peek() == "OR":
+            take()
+            mask = mask | parse_and()
+        return mask
+
+    def parse_and():
+        mask = parse_not()
+        while peek() == "AND":
+            take()
+            mask = mask & parse_not()
+        return mask
+
+    def parse_not():
+        if peek() == "NOT":
+            take()
+            return ~parse_not()
+        if peek() == "(":
+            take()
+            mask = parse_or()
+            if peek() != ")":
+                raise ValueError(f"Missing ')' in flag expression: {expression!r}")
+            take()
+            return mask
+        if peek() is None:
+            raise ValueError(f"Incomplete flag expression: {expression!r}")
+        name = take()
+        if name.lower() not in _FLAG_NAMES:
+            raise ValueError(f"Unknown feature flag {name!r}; expected one of {sorted(set(FEATURE_FLAGS.values()))}")
+        return flag_view(flags, _FLAG_NAMES[name.lower()])
+
+    mask = parse_or()
+    if position != len(tokens):
+        raise ValueError(f"Unexpected {tokens[position]!r} in flag expression: {expression!r}")
+    return mask
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, norm, rankdata
+
+
+# =============================================================================
+# Rank-Once Engine
+# =============================================================================
+class RankEngine:
+    """
+    Ranks each engagement metric once and derives the rank-based tests from group rank sums.
+
+    Mann-Whitney U, Kruskal-Wallis H and Dunn's pairwise tests are all functions of the
+    tie-corrected average ranks, the group sizes and the tie term, so a metric is sorted
+    a single time no matter how many grouping columns are tested against it. Results match
+    scipy's asymptotic `mannwhitneyu` / `kruskal` and scikit-posthocs' `posthoc_dunn`.
+    Rows with a missing metric value or group label are excluded, as in those functions.
+    """
+
+    def __init__(self, df: pd.DataFrame, metrics: list):
+        self.df = df
+        self.metrics = metrics
+        self._ranks = {}
+
+    def _ranked(self, metric: str, rows: np.ndarray = None, key: str = None) -> tuple:
+        """Returns (ranks, tie term sum(t^3 - t), valid mask) for a metric, cached per row subset."""
+        cache_key = (metric, key)
+        if cache_key not in self._ranks:
+            values = self.df[metric].to_numpy(dtype="float64", na_value=np.nan)
+            valid = ~np.isnan(values)
+            if rows is not None:
+                valid &= rows
+            ranks = np.full(len(values), np.nan)
+            ranks[valid] = rankdata(values[valid])
+            _, ties = np.unique(values[valid], return_counts=True)
+            tie_term = float(np.sum(ties.astype("float64") ** 3 - ties))
+            self._ranks[cache_key] = ranks, tie_term, valid
+        return self._ranks[cache_key]
+
+    def _group_rank_sums(self, metric: str, group_col: str) -> tuple:
+        """Returns (group labels, group sizes, group rank sums, N, tie term) for a grouping column."""
+        codes, labels = pd.factorize(self.df[group_col], sort=True)
+        has_group = codes >= 0
+        key = None if has_group.all() else group_col
+        ranks, tie_term, valid = self._ranked(metric, has_group if key else None, key)
+        codes, ranks = codes[valid], ranks[valid]
+        sizes = np.bincount(codes, minlength=len(labels)).astype("float64")
+        rank_sums = np.bincount(codes, weights=ranks, minlength=len(labels))
+        present = sizes > 0
+        return labels[present], sizes[present], rank_sums[present], len(ranks), tie_term
+
+    def mann_whitney(self, metric: str, flag_col: str) -> tuple:
+        """Two-sided Mann-Whitney U test of flag == 1 against flag == 0; U is that of the flagged group."""
+        flags = self.df[flag_col].fillna(0).to_numpy() == 1
+        ranks, tie_term, valid = self._ranked(metric)
+        n1, n2 = float(np.sum(flags & valid)), float(np.sum(~flags & valid))
+        n = n1 + n2
+        u1 = np.sum(ranks[flags & valid]) - n1 * (n1 + 1) / 2
+        mean_u = n1 * n2 / 2
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        z = (abs(u1 - mean_u) - 0.5) / sigma  # continuity correction, as in scipy
+        return float(u1), float(min(1.0, 2 * norm.sf(z)))
+
+    def mann_whitney_many(self, metric: str, flag_cols: list) -> tuple:
+        """Mann-Whitney U test of every flag column at once; returns (U, p) arrays in `flag_cols` order."""
+        flags = self.df[flag_cols].fillna(0).to_numpy() == 1
+        ranks, tie_term, valid = self._ranked(metric)
+        flags = flags[valid]
+        n1 = flags.sum(axis=0).astype("float64")
+        n2 = len(flags) - n1
+        n = n1 + n2
+        u1 = ranks[valid] @ flags - n1 * (n1 + 1) / 2
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (np.abs(u1 - n1 * n2 / 2) - 0.5) / sigma
+        return u1, np.minimum(1.0, 2 * norm.sf(z))
+
+    def kruskal(self, metric: str, group_col: str) -> tuple:
+        """Tie-corrected Kruskal-Wallis H test across the groups of `group_col`."""
+        _, sizes, rank_sums, n, tie_term = self._group_rank_sums(metric, group_col)
+        h = 12.0 / (n * (n + 1)) * np.sum(rank_sums ** 2 / sizes) - 3 * (n + 1)
+        h /= 1 - tie_term / (n ** 3 - n)
+        return float(h), float(chi2.sf(h, len(sizes) - 1))
+
+    def dunn(self, metric: str, group_col: str, p_adjust: str = "bonferroni") -> pd.DataFrame:
+        """All pairwise Dunn's test p-values for `group_col` as one vectorized matrix."""
+        labels, sizes, rank_sums, n, tie_term = self._group_rank_sums(metric, group_col)
+        mean_ranks = rank_sums / sizes
+        diff = np.abs(mean_ranks[:, None] - mean_ranks[None, :])
+        scale = (n * (n + 1) / 12.0 - tie_term / (12.0 * (n - 1))) * (1 / sizes[:, None] + 1 / sizes[None, :])
+        p_values = 2 * norm.sf(diff / np.sqrt(scale))
+
+        if p_adjust == "bonferroni":
+            pairs = len(sizes) * (len(sizes) - 1) / 2
+            p_values = np.minimum(p_values * pairs, 1.0)
+        elif p_adjust:
+            raise ValueError(f"Unsupported p_adjust method: {p_adjust}")
+        np.fill_diagonal(p_values, 1.0)
+        return pd.DataFrame(p_values, index=labels, columns=labels)
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# =============================================================================
+# Cache Settings
+# =============================================================================
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.environ.get("SENTIMENT_CACHE_PATH", os.path.join(BASE_PATH, "sentiment_cache.sqlite"))
+MAX_ENTRIES = 5_000_000  # Least recently used scores are evicted beyond this
+MIN_PARALLEL_TEXTS = 2_000  # Smaller miss batches are scored in-process
+SQLITE_BATCH = 500
+SENTIMENT_COLUMNS = ["Positive Sentiment", "Neutral Sentiment", "Negative Sentiment", "Compound Sentiment"]
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapses whitespace; VADER splits on whitespace, so the scores do not change."""
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+# =============================================================================
+# Per-Worker Scoring
+# =============================================================================
+_analyzer = None
+
+
+def _init_worker():
+    global _analyzer
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    _analyzer = SentimentIntensityAnalyzer()
+
+
+def _score(text: str) -> tuple:
+    if _analyzer is None:
+        _init_worker()
+    scores = _analyzer.polarity_scores(text)
+    return scores["pos"], scores["neu"], scores["neg"], scores["compound"]
+
+
+def score_texts(texts: list, workers: int = None) -> list:
+    """Scores texts with VADER, in a process pool with one analyzer per worker for large batches."""
+    if len(texts) < MIN_PARALLEL_TEXTS or workers == 1:
+        return [_score(text) for text in texts]
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(_score, texts, chunksize=max(1, len(texts) // (workers * 8))))
+
+
+# =============================================================================
+# Persistent Cache
+# =============================================================================
+class SentimentCache:
+    """SQLite store of VADER scores keyed by a hash of the normalized post text, with LRU eviction."""
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment ("
+            "key BLOB PRIMARY KEY, pos REAL, neu REAL, neg REAL, compound REAL, last_used INTEGER)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS sentiment_last_used ON sentiment (last_used)")
+
+    def get_many(self, keys: list) -> dict:
+        found = {}
+        for i in range(0, len(keys), SQLITE_BATCH):
+            batch = keys[i:i + SQLITE_BATCH]
+            rows = self.conn.execute(
+                f"SELECT key, pos, neu, neg, compound FROM sentiment WHERE key IN ({','.join('?' * len(batch))})",
+                batch
+            )
+            found.update((row[0], row[1:]) for row in rows)
+        if found:
+            now = int(time.time())
+            self.conn.executemany("UPDATE sentiment SET last_used = ? WHERE key = ?", ((now, k) for k in found))
+            self.conn.commit()
+        return found
+
+    def put_many(self, scores: dict):
+        now = int(time.time())
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sentiment VALUES (?, ?, ?, ?, ?, ?)",
+            ((key, *values, now) for key, values in scores.items())
+        )
+        self.conn.commit()
+        self.evict()
+
+    def evict(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM sentiment WHERE key IN (SELECT key FROM sentiment ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,)
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def analyze_sentiment_series(texts: pd.Series, cache: SentimentCache = None, workers: int = None) -> pd.DataFrame:
+    """
+    Returns the four VADER score columns for a Series of post texts.
+
+    Identical texts (e.g. reposts) are scored once, cached scores are reused and only
+    cache misses are sent to the process pool.
+    """
+    normalized = texts.fillna("").map(normalize_text)
+    keys = normalized.map(text_key)
+    unique = dict(zip(keys, normalized))
+
+    scores = cache.get_many(list(unique)) if cache else {}
+    missing = [key for key in unique if key not in scores]
+    if missing:
+        new_scores = dict(zip(missing, score_texts([unique[key] for key in missing], workers=workers)))
+        if cache:
+            cache.put_many(new_scores)
+        scores.update(new_scores)
+
+    return pd.DataFrame([scores[key] for key in keys], columns=SENTIMENT_COLUMNS, index=texts.index)
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+
+from cta_matcher import DEFAULT_CTA_PHRASES
+
+# =============================================================================
+# Corpus Settings
+# =============================================================================
+# Shapes are taken from 0_data_set.xlsx: a few authors write most posts, counts are
+# heavy tailed, shares are often missing and a few cells carry the scraper's quirks.
+SHEET_NAME = "Technology & Innovation"
+START_MS = int(pd.Timestamp("2021-01-01", tz="UTC").timestamp() * 1000)
+END_MS = int(pd.Timestamp("2025-01-01", tz="UTC").timestamp() * 1000)
+AUTHOR_ZIPF_EXPONENT = 1.1
+ROWS_PER_AUTHOR = 200
+
+FEATURE_RATES = {
+    "emoji": 0.62, "hashtag": 0.60, "question": 0.43, "link": 0.19, "cta": 0.12, "quote": 0.04
+}
+REPOST_RATE = 0.012
+DUPLICATE_RATE = 0.005
+MISSING_SHARES_RATE = 0.10
+DOTTED_THOUSANDS_RATE = 0.03  # Excel reads "6.389" as 6.389
+SUFFIX_RATE = 0.01  # Counts scraped as "1.2K"
+
+FIRST_NAMES = ["Allie", "Anthony", "Dan", "Martin", "Aisha", "Avery", "Asmau", "Greg", "Maria", "Jonas",
+               "Priya", "Kenji", "Lea", "Omar", "Sofia", "Lukas", "Chen", "Nadia", "Tomas", "Elena"]
+LAST_NAMES = ["Miller", "Day", "Burgar", "Harbech", "Bowe", "Akkineni", "Ahmed", "Coquillo", "Garcia", "Weber",
+              "Sharma", "Tanaka", "Martin", "Haddad", "Rossi", "Fischer", "Wang", "Petrova", "Novak", "Lopez"]
+OPENERS = [
+    "This is a recap of the top AI news this week.",
+    "We just shipped a new feature for our data platform.",
+    "Three lessons I learned from scaling an engineering team.",
+    "Generative AI is changing how product teams work.",
+    "Our latest research on cloud costs is out.",
+    "Big milestone for the team today.",
+    "Most companies still underestimate data quality.",
+    "Here is what I wish I knew before my first startup.",
+    "The future of work is hybrid, but not how you think.",
+    "I spent the weekend testing the newest open source models.",
+]
+BODIES = [
+    "The results surprised even our most skeptical engineers.",
+    "It took us six months, two rewrites and a lot of coffee.",
+    "Adoption grew 40% in the first quarter after launch.",
+    "The hardest part was not the technology but the people.",
+    "Small teams with clear ownership moved the fastest.",
+    "Latency dropped from seconds to milliseconds.",
+    "Customers told us the onboarding finally feels simple.",
+    "None of this would work without good documentation.",
+]
+QUESTIONS = ["What do you think?", "Would you try this?", "How is your team handling this?",
+             "Which tool do you use?"]
+QUOTES = ['"Simplicity is the ultimate sophistication."', '"Move fast and fix things."',
+          '"Data beats opinions."', '"The best way to predict the future is to invent it."']
+HASHTAGS = ["#AI", "#MachineLearning", "#Innovation", "#Leadership", "#Startups", "#Data", "#Cloud",
+            "#FutureOfWork", "#GenAI", "#Tech"]
+EMOJIS = ["\U0001F680", "\U0001F4A1", "\U0001F525", "\U0001F44F", "\U0001F389", "✅", "\U0001F916",
+          "\U0001F4C8"]
+LINKS = ["https://example.com/report", "https://lnkd.in/abc123", "www.example.org/blog/post",
+         "https://github.com/example/repo"]
+
+
+def _pick(rng: np.random.Generator, pool: list, n: int) -> np.ndarray:
+    return np.asarray(pool, dtype=object)[rng.integers(0, len(pool), n)]
+
+
+def _optional(rng: np.random.Generator, pool: list, rate: float, n: int, prefix: str = " ") -> pd.Series:
+    """Per row, a random element of `pool` with probability `rate`, else an empty string."""
+    values = np.where(rng.random(n) < rate, prefix + _pick(rng, pool, n), "")
+    return pd.Series(values, dtype="str")
+
+
+# =============================================================================
+# Generator
+# =============================================================================
+def generate_authors(rng: np.random.Generator, n_authors: int) -> tuple:
+    """Returns (display names, URL slugs) of distinct synthetic authors."""
+    combos = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+    rng.shuffle(combos)
+    names = [combos[i] if i < len(combos) else f"{combos[i % len(combos)]} {i}" for i in range(n_authors)]
+    slugs = [name.lower().replace(" ", "") for name in names]
+    return np.asarray(names, dtype=object), np.asarray(slugs, dtype=object)
+
+
+def activity_ids(rng: np.random.Generator, n: int) -> tuple:
+    """Returns (snowflake activity IDs, post times in epoch ms); posting times cluster in working hours."""
+    days = rng.integers(START_MS // 86_400_000, END_MS // 86_400_000, n)
+    hours = np.clip(rng.normal(13, 3.5, n), 0, 23.999)
+    timestamp_ms = days * 86_400_000 + (hours * 3_600_000).astype(np.int64)
+    low_bits = rng.integers(0, 1 << 22, n, dtype=np.uint64)
+    ids = (timestamp_ms.astype(np.uint64) << np.uint64(22)) | low_bits
+    return ids, timestamp_ms
+
+
+def generate_corpus(n_rows: int, seed: int = 0, n_authors: int = None) -> pd.DataFrame:
+    """
+    Generates a raw corpus with the columns and quirks of the '0_data_set.xlsx' sheet.
+
+    Authors follow a Zipf distribution, Post URLs carry valid activity snowflake IDs,
+    post content mixes emojis, hashtags, links, quotes, CTAs and questions at the rates
+    of the real data, and engagement is log-normal with an author effect. The same
+    seed always yields the same corpus.
+    """
+    rng = np.random.default_rng(seed)
+    n_authors = n_authors or max(8, n_rows // ROWS_PER_AUTHOR)
+    names, slugs = generate_authors(rng, n_authors)
+
+    weights = 1.0 / np.arange(1, n_authors + 1) ** AUTHOR_ZIPF_EXPONENT
+    author = rng.choice(n_authors, n_rows, p=weights / weights.sum())
+
+    content = (
+        pd.Series(_pick(rng, OPENERS, n_rows), dtype="str")
+        + " " + pd.Series(_pick(rng, BODIES, n_rows), dtype="str")
+        + _optional(rng, QUOTES, FEATURE_RATES["quote"], n_rows)
+        + _optional(rng, [p.capitalize() + " below." for p in DEFAULT_CTA_PHRASES], FEATURE_RATES["cta"], n_rows)
+        + _optional(rng, LINKS, FEATURE_RATES["link"], n_rows)
+        + _optional(rng, QUESTIONS, FEATURE_RATES["question"], n_rows)
+        + _optional(rng, EMOJIS, FEATURE_RATES["emoji"], n_rows)
+        + _optional(rng, HASHTAGS, FEATURE_RATES["hashtag"], n_rows, prefix="\n\n")
+    )
+
+    ids, _ = activity_ids(rng, n_rows)
+    suffix = pd.Series(_pick(rng, list("ABCDEFGHJKLMNPQRSTUVWXYZ"), n_rows), dtype="str")
+    post_url = ("https://www.linkedin.com/posts/" + pd.Series(slugs[author], dtype="str")
+                + "_post-activity-" + pd.Series(ids.astype(str), dtype="str") + "-" + suffix
+                + "?utm_source=share&utm_medium=member_desktop")
+
+    # Heavy-tailed engagement: log-normal reactions scaled by a per-author reach
+    reach = rng.lognormal(0, 1.0, n_authors)[author]
+    reactions = np.maximum(1, np.round(rng.lognormal(4.3, 1.6, n_rows) * reach))
+    comments = np.maximum(0, np.round(reactions * rng.lognormal(-2.3, 0.8, n_rows)))
+    shares = np.maximum(1, np.round(reactions * rng.lognormal(-2.0, 1.0, n_rows))).astype("float64")
+    shares[rng.random(n_rows) < MISSING_SHARES_RATE] = np.nan
+
+    df = pd.DataFrame({
+        "TL": pd.Series(names[author], dtype="str"),
+        "Post content": content,
+        "Nur Repost": np.where(rng.random(n_rows) < REPOST_RATE, "x", None),
+        "Post URL": post_url,
+        "reactions": reactions.astype("float64"),
+        "comments": comments.astype("int64").astype(object),
+        "shares": shares
+    })
+
+    # Scraper quirks: dotted thousands read as decimals, "1.2K" strings and duplicate rows
+    dotted = (rng.random(n_rows) < DOTTED_THOUSANDS_RATE) & (reactions >= 1000) & (reactions % 1000 != 0)
+    df.loc[dotted, "reactions"] = reactions[dotted] / 1000
+    suffixed = (rng.random(n_rows) < SUFFIX_RATE) & (comments >= 1000)
+    df.loc[suffixed, "comments"] = [f"{c / 1000:.1f}K" for c in comments[suffixed]]
+    order = np.arange(n_rows)
+    duplicated = rng.random(n_rows) < DUPLICATE_RATE
+    order[duplicated] = rng.integers(0, n_rows, int(duplicated.sum()))
+    return df.iloc[order].reset_index(drop=True)
+
+
+def write_corpus(df: pd.DataFrame, path: str):
+    """Writes a corpus as the raw workbook the cleaning stage reads (Excel caps a sheet at 1,048,576 rows)."""
+    df.to_excel(path, sheet_name=SHEET_NAME, index=False)
@@ -0,0 +1,94 @@
+import mimetypes
+import os
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =============================================================================
+# Stub Server Settings
+# =============================================================================
+# Serves the recorded metrocuadrado pages of PAGES_DIR: /search?page=N returns
+# search_N.html and /inmueble/<id> returns <id>.html; any /static/ path answers a
+# small placeholder asset, so blocked resources show up (or not) in `requests`.
+# The listings in FLAKY_PATHS answer 503 on their first request, so the scraper's
+# retries are exercised.
+# Run it directly and point METROCUADRADO_SEARCH_URL at it for a local crawl.
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "metrocuadrado_pages")
+FLAKY_PATHS = {"/inmueble/apto-102"}
+
+
+class StubServer:
+    """Threaded HTTP server of the recorded pages; `requests` lists every requested path in order."""
+
+    def __init__(self, port: int = 0, pages_dir: str = PAGES_DIR):
+        self.pages_dir = pages_dir
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def hits(self, path: str) -> int:
+        with self._lock:
+            return sum(1 for requested in self.requests if urllib.parse.urlsplit(requested).path == path)
+
+    def page_file(self, path: str, query: dict) -> str:
+        if path == "/search":
+            return f"search_{query.get('page', ['1'])[0]}.html"
+        if path.startswith("/inmueble/"):
+            return os.path.basename(path) + ".html"
+        return None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parts = urllib.parse.urlsplit(self.path)
+                with stub._lock:
+                    stub.requests.append(self.path)
+                if parts.path in FLAKY_PATHS and stub.hits(parts.path) == 1:
+                    return self.reply(503, b"Service Unavailable")
+                if parts.path.startswith("/static/"):
+                    return self.reply(200, b"\0" * 64, mimetypes.guess_type(parts.path)[0] or "application/octet-stream")
+                name = stub.page_file(parts.path, urllib.parse.parse_qs(parts.query))
+                path = os.path.join(stub.pages_dir, name) if name else None
+                if path is None or not os.path.exists(path):
+                    return self.reply(404, b"Not Found")
+                with open(path, "rb") as f:
+                    self.reply(200, f.read(), "text/html; charset=utf-8")
+
+            def reply(self, status: int, body: bytes, content_type: str = "text/plain"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    with StubServer(int(sys.argv[1]) if len(sys.argv) > 1 else 8765) as server:
+        print(f"Serving recorded pages at {server.url}/search?search=form (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,64 @@
+import json
+import os
+import shutil
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_profile import NEXT_DATA_READY, apply_block_profile, configure_options, url_blocked, wait_until_ready
+from metrocuadrado_stub import StubServer
+
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+
+class BlockPatternTest(unittest.TestCase):
+    def test_query_strings_do_not_escape_the_blocklist(self):
+        self.assertTrue(url_blocked("https://img.example.com/fotos/1.jpg?w=800&h=600", "data"))
+        self.assertTrue(url_blocked("https://example.com/fonts/lato.woff2?v=3", "data"))
+        self.assertTrue(url_blocked("https://example.com/tour.mp4?autoplay=1", "images"))
+        self.assertTrue(url_blocked("https://www.googletagmanager.com/gtm.js?id=GTM-1", "images"))
+        self.assertFalse(url_blocked("https://img.example.com/fotos/1.jpg?w=800", "images"))
+        self.assertFalse(url_blocked("https://example.com/inmueble/apto-101?foto=1.jpg", "off"))
+        self.assertFalse(url_blocked("https://example.com/inmueble/apto-101", "data"))
+
+
+@unittest.skipUnless(any(shutil.which(name) for name in CHROME_BINARIES), "Chrome is not installed")
+class ChromeBlockingTest(unittest.TestCase):
+    """Loads a recorded listing in headless Chrome and reads the requests it blocked from its network log."""
+
+    def test_data_profile_blocks_static_assets(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        options = Options()
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        configure_options(options)
+        with StubServer() as server:
+            driver = webdriver.Chrome(options=options)
+            try:
+                apply_block_profile(driver, "data")
+                driver.get(f"{server.url}/inmueble/apto-101")
+                self.assertTrue(wait_until_ready(driver, NEXT_DATA_READY))
+                time.sleep(1)  # Let the subresource requests of the eager load settle
+                events = [json.loads(entry["message"])["message"] for entry in driver.get_log("performance")]
+            finally:
+                driver.quit()
+
+        requested = {event["params"]["requestId"]: event["params"]["request"]["url"]
+                     for event in events if event["method"] == "Network.requestWillBeSent"}
+        blocked = sorted(requested[event["params"]["requestId"]] for event in events
+                         if event["method"] == "Network.loadingFailed"
+                         and event["params"].get("blockedReason") and event["params"]["requestId"] in requested)
+        print("Blocked requests:", *blocked, sep="\n  ")
+        self.assertIn(f"{server.url}/static/fotos/apto-101.jpg?w=800&h=600", blocked)
+        self.assertTrue(all(url_blocked(url, "data") for url in blocked))
+        self.assertEqual([path for path in server.requests if path.startswith("/static/")], [])
+        self.assertIn("/inmueble/apto-101", server.requests)
+
+
+if __name__ == "__main__":
+    unittest.main()
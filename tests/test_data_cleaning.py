@@ -0,0 +1,91 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_PATH)
+os.environ.setdefault("CLEANING_LOG", os.path.join(tempfile.gettempdir(), "test_data_cleaning_log.txt"))
+
+
+def load_cleaning():
+    """Imports 1_Data Cleaning.py, whose file name is not a valid module name."""
+    spec = importlib.util.spec_from_file_location("data_cleaning", os.path.join(BASE_PATH, "1_Data Cleaning.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # The all_sheets workers unpickle _clean_sheet by module name
+    spec.loader.exec_module(module)
+    return module
+
+
+cleaning = load_cleaning()
+
+from pipeline_store import read_stage, stage_columns
+
+
+class ParseEngagementCountsTest(unittest.TestCase):
+    def parse(self, values, dtype=object):
+        counts, unparsed = cleaning.parse_engagement_counts(pd.Series(values, dtype=dtype))
+        return counts.tolist(), unparsed.tolist()
+
+    def test_dotted_thousands_with_dropped_trailing_zeros(self):
+        # Excel stored "2.380" as 2.38 and "29.600" as 29.6
+        counts, unparsed = self.parse([2.38, 29.6, 40.81, 6.389, 12.0], dtype="float64")
+        self.assertEqual(counts, [2380, 29600, 40810, 6389, 12])
+        self.assertEqual(unparsed, [False] * 5)
+
+    def test_unreadable_counts_are_unparsed(self):
+        counts, unparsed = self.parse([1.2345, -3, "-3", "1.5", "youtube.com"])
+        self.assertTrue(all(count is pd.NA for count in counts))
+        self.assertEqual(unparsed, [True] * 5)
+
+    def test_text_counts(self):
+        counts, unparsed = self.parse(["1,234", "1.234", "1 234", "1.2K", "3,5M", "1500", None])
+        self.assertEqual(counts, [1234, 1234, 1234, 1200, 3500000, 1500, 0])
+        self.assertEqual(unparsed, [False] * 7)
+
+
+class CleanAllSheetsTest(unittest.TestCase):
+    """CLEANING_MODE=all_sheets writes a hive directory partitioned by industry instead of one file."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workbook = os.path.join(self.tmp.name, "0_data_set.xlsx")
+        self.stage = os.path.join(self.tmp.name, "1_data_set_cleaned")
+        sheets = {
+            "Technology & Innovation": [("tech-1", 10), ("tech-2", 2.38), ("shared", 5)],
+            "Finance": [("fin-1", 7), ("shared", 5)]
+        }
+        with pd.ExcelWriter(self.workbook) as writer:
+            for sheet_name, rows in sheets.items():
+                pd.DataFrame({
+                    "TL": "", "Post content": [f"Post {url}" for url, _ in rows], "Nur Repost": "",
+                    "Post URL": [f"https://www.linkedin.com/posts/{url}" for url, _ in rows],
+                    "reactions": [reactions for _, reactions in rows], "comments": 1, "shares": 0
+                }).to_excel(writer, sheet_name=sheet_name, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_partitioned_output_columns_and_rows(self):
+        cleaning.clean_all_sheets(self.workbook, self.stage, workers=1)
+
+        self.assertTrue(os.path.isdir(f"{self.stage}.parquet"))
+        columns = stage_columns(self.stage)
+        self.assertIn("industry", columns)
+        self.assertTrue({"Post URL", "reactions", "comments", "shares"} <= set(columns))
+
+        df = read_stage(self.stage).sort_values("Post URL").reset_index(drop=True)
+        self.assertEqual([url.rsplit("/", 1)[1] for url in df["Post URL"]], ["fin-1", "shared", "tech-1", "tech-2"])
+        # The post listed in both sheets is kept under the first sheet
+        self.assertEqual(df.loc[df["Post URL"].str.endswith("shared"), "industry"].tolist(), ["Technology & Innovation"])
+        self.assertEqual(df["reactions"].tolist(), [7, 5, 10, 2380])
+
+    def test_missing_stage_has_no_columns(self):
+        self.assertEqual(stage_columns(self.stage), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
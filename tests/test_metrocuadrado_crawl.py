@@ -0,0 +1,84 @@
+import asyncio
+import csv
+import os
+import sys
+import tempfile
+import unittest
+
+# No debug artifacts and no request spacing against the local stub
+os.environ["DEBUG_LEVEL"] = "off"
+os.environ["HOST_RATE_LIMIT"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrocuadrado_scraper as scraper
+from crawl_state import CrawlState
+from metrocuadrado_stub import StubServer
+
+
+class CrawlHttpTest(unittest.TestCase):
+    """crawl_http against the recorded search and listing pages of the stub server."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = StubServer().__enter__()
+        self.seed = f"{self.server.url}/search?search=form&page=1"
+        self.output = os.path.join(self.tmp.name, "properties.csv")
+        self.state = CrawlState(os.path.join(self.tmp.name, "crawl.sqlite"))
+
+    def tearDown(self):
+        self.state.close()
+        self.server.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def crawl(self):
+        writer = scraper.ListingWriter(self.output)
+        try:
+            return asyncio.run(scraper.crawl_http(self.state, writer))
+        finally:
+            writer.close()
+
+    def listing_status(self):
+        return dict(self.state.conn.execute("SELECT url, status FROM listings").fetchall())
+
+    def test_crawl_writes_listings_and_checkpoints_pages(self):
+        self.assertFalse(self.state.start_crawl(self.seed))
+        fallback, browser_search = self.crawl()
+
+        self.assertFalse(browser_search)
+        # Client-side rendered listing: left for the browser
+        self.assertEqual([url.split("?")[0] for url in fallback], [f"{self.server.url}/inmueble/apto-202"])
+        with open(self.output, encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(sorted(row["property_id"] for row in rows), ["MC101", "MC102", "MC103", "MC201", "MC301"])
+        # The 503 of apto-102 was retried
+        self.assertEqual(self.server.hits("/inmueble/apto-102"), 2)
+        # A listing whose JSON cannot be parsed is marked failed without stopping the page
+        status = {url.split("?")[0].rsplit("/", 1)[1]: value for url, value in self.listing_status().items()}
+        self.assertEqual(status["apto-203"], "failed")
+        self.assertEqual(status["apto-301"], "done")
+        self.assertEqual(self.state.pending_search_pages(), [])
+
+    def test_fresh_listings_are_not_fetched_again(self):
+        self.state.start_crawl(self.seed)
+        self.crawl()
+        fetched = self.server.hits("/inmueble/apto-101")
+        self.state.start_crawl(self.seed)
+        self.crawl()
+        self.assertEqual(self.server.hits("/inmueble/apto-101"), fetched)
+
+    def test_resume_only_for_the_same_search_url(self):
+        self.state.start_crawl(self.seed)
+        page_2 = f"{self.server.url}/search?search=form&page=2"
+        self.state.add_search_page(page_2, 2)
+        self.state.mark_search_page(self.seed)
+
+        self.assertTrue(self.state.start_crawl(self.seed))
+        self.assertEqual(self.state.pending_search_pages(), [(page_2, 2)])
+
+        other_seed = f"{self.server.url}/search?search=form&page=3"
+        self.assertFalse(self.state.start_crawl(other_seed))
+        self.assertEqual(self.state.pending_search_pages(), [(other_seed, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()